@@ -1,6 +1,6 @@
 {
     'name': 'Custom Approval',
-    'version': '18.0.1.0.3',
+    'version': '18.0.1.2.0',
     'category': 'Approvals',
     'summary': 'Enterprise-equivalent Approval Module for Odoo 18 Community',
     'description': """
@@ -45,18 +45,22 @@ Technical:
         'security/approval_security.xml',
         'security/ir.model.access.csv',
         'data/approval_category_data.xml',
+        'data/approval_cron_data.xml',
         'views/approval_category_views.xml',
         'views/approval_request_views.xml',
         'views/approval_refuse_wizard_views.xml',
         'views/approval_dashboard_views.xml',
-        'views/approval_menus.xml',
+        'views/approval_import_job_views.xml',
         'views/purchase_order_views.xml',
+        'views/approval_menus.xml',
+        'views/approval_portal_templates.xml',
         'data/approval_templates.xml',
     ],
     'assets': {
         'web.assets_backend': [
             'custom_approval/static/src/js/approval_request_form.js',
             'custom_approval/static/src/js/approval_kanban.js',
+            'custom_approval/static/src/js/approval_systray.js',
             'custom_approval/static/src/xml/approval_request_templates.xml',
         ],
     },
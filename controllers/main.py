@@ -2,15 +2,50 @@
 
 from odoo import http
 from odoo.http import request
+from odoo.addons.portal.controllers.portal import pager as portal_pager
 
 
 class ApprovalPortal(http.Controller):
-    """Portal controller for approval requests"""
+    """Portal controller for approval requests.
 
-    @http.route('/my/approvals', type='http', auth='user', website=True)
-    def portal_my_approvals(self, **kw):
+    These routes only read stored fields and are declared ``readonly`` so
+    that deployments with ``db_replica_host`` serve them from the replica.
+    """
+
+    _items_per_page = 80
+
+    @http.route(['/my/approvals', '/my/approvals/page/<int:page>'], type='http', auth='user', website=True, readonly=True)
+    def portal_my_approvals(self, page=1, **kw):
         """Portal page for user's approval requests"""
+        Request = request.env['approval.request']
+        domain = [
+            '|',
+            ('request_owner_id', '=', request.env.uid),
+            ('approver_ids.user_id', '=', request.env.uid),
+        ]
+        pager = portal_pager(
+            url='/my/approvals',
+            total=Request.search_count(domain),
+            page=page,
+            step=self._items_per_page,
+        )
+        approval_requests = Request.search_read(
+            domain,
+            ['name', 'category_id', 'request_owner_id', 'date', 'amount', 'state'],
+            limit=self._items_per_page,
+            offset=pager['offset'],
+        )
         return request.render('custom_approval.portal_my_approvals', {
             'page_name': 'approvals',
+            'approval_requests': approval_requests,
+            'state_labels': dict(Request._fields['state']._description_selection(request.env)),
+            'pager': pager,
         })
 
+    @http.route('/approvals/status', type='json', auth='user', readonly=True)
+    def approval_status(self, request_ids):
+        """Return the status of the given requests, for clients polling decisions"""
+        return request.env['approval.request'].search_read(
+            [('id', 'in', request_ids)],
+            ['state', 'approved_count', 'write_date'],
+        )
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """Clean up the templates of earlier versions once, then leave templates alone on updates.
+
+    The data file used to delete and recreate every approval template on each
+    update; templates are now loaded as noupdate records. Approvals already
+    pending get their escalation deadline, counted from the upgrade.
+    """
+    if not version:
+        return
+
+    _arm_pending_deadlines(cr)
+
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    current = [
+        env.ref('custom_approval.email_template_approval_request_%s_v2' % kind, raise_if_not_found=False)
+        for kind in ('submitted', 'approved', 'refused')
+    ]
+    current_ids = [template.id for template in current if template]
+    cr.execute("""
+        SELECT res_id
+          FROM ir_model_data
+         WHERE module = 'custom_approval'
+           AND model = 'mail.template'
+           AND res_id != ALL(%s)
+    """, [current_ids])
+    obsolete_ids = [row[0] for row in cr.fetchall()]
+    env['mail.template'].browse(obsolete_ids).exists().unlink()
+
+    cr.execute("""
+        UPDATE ir_model_data
+           SET noupdate = TRUE
+         WHERE module = 'custom_approval'
+           AND model = 'mail.template'
+    """)
+
+
+def _arm_pending_deadlines(cr):
+    """Give the current step of pending requests an escalation deadline.
+
+    Lines submitted before escalation existed have none, so the escalation
+    cron would never see them; their delay starts at the upgrade.
+    """
+    cr.execute("""
+        UPDATE approval_approver app
+           SET deadline = (NOW() AT TIME ZONE 'UTC') + make_interval(hours => cat.escalation_delay)
+          FROM approval_request req
+          JOIN approval_category cat ON cat.id = req.category_id
+         WHERE req.id = app.request_id
+           AND app.status = 'pending'
+           AND app.deadline IS NULL
+           AND req.state = 'pending'
+           AND cat.escalation_policy != 'none'
+           AND cat.escalation_delay > 0
+           AND (NOT COALESCE(cat.approval_sequence, FALSE)
+                OR NOT EXISTS (SELECT 1 FROM approval_approver prev
+                                WHERE prev.request_id = app.request_id
+                                  AND prev.sequence < app.sequence
+                                  AND prev.status != 'approved'))
+    """)
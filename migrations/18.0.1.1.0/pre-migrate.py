@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+
+import logging
+
+from odoo.tools.sql import column_exists, create_column
+
+_logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 50000
+
+
+def migrate(cr, version):
+    """Create and backfill the request decision counters before the ORM sees them.
+
+    Creating the columns here keeps the registry update from touching every
+    request; the backfill runs over id ranges so each statement stays small.
+    """
+    if not version:
+        return
+
+    if column_exists(cr, 'approval_request', 'approved_count') and column_exists(cr, 'approval_request', 'refused_count'):
+        return
+    create_column(cr, 'approval_request', 'approved_count', 'int4')
+    create_column(cr, 'approval_request', 'refused_count', 'int4')
+
+    cr.execute("SELECT COALESCE(MIN(id), 0), COALESCE(MAX(id), 0) FROM approval_request")
+    min_id, max_id = cr.fetchone()
+    for start in range(min_id, max_id + 1, BATCH_SIZE):
+        cr.execute("""
+            UPDATE approval_request req
+               SET approved_count = COALESCE(dec.approved, 0),
+                   refused_count = COALESCE(dec.refused, 0)
+              FROM (SELECT r.id,
+                           COUNT(app.id) FILTER (WHERE app.status = 'approved') AS approved,
+                           COUNT(app.id) FILTER (WHERE app.status = 'refused') AS refused
+                      FROM approval_request r
+                 LEFT JOIN approval_approver app ON app.request_id = r.id
+                     WHERE r.id >= %(start)s AND r.id < %(stop)s
+                  GROUP BY r.id) dec
+             WHERE req.id = dec.id
+        """, {'start': start, 'stop': start + BATCH_SIZE})
+    _logger.info('Backfilled approval decision counters for requests %s to %s', min_id, max_id)
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+
+import logging
+
+from odoo import api, SUPERUSER_ID
+from odoo.tools import split_every
+
+_logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 5000
+
+
+def migrate(cr, version):
+    """Backfill request fingerprints chunk by chunk, keeping memory bounded"""
+    if not version:
+        return
+
+    env = api.Environment(cr, SUPERUSER_ID, {'active_test': False})
+    Request = env['approval.request']
+    cr.execute("SELECT id FROM approval_request WHERE fingerprint IS NULL ORDER BY id")
+    request_ids = [row[0] for row in cr.fetchall()]
+    for chunk in split_every(BATCH_SIZE, request_ids):
+        env.add_to_compute(Request._fields['fingerprint'], Request.browse(chunk))
+        Request.flush_model(['fingerprint'])
+        env.invalidate_all()
+    _logger.info('Backfilled fingerprints of %s approval requests', len(request_ids))
@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tools.sql import column_exists, create_column
+
+
+def migrate(cr, version):
+    """Create the duplicate detection columns before the ORM sees them.
+
+    Otherwise the registry update computes the fingerprint of every request
+    in one go; it is backfilled in chunks by the post-migration instead.
+    """
+    if not version:
+        return
+
+    if not column_exists(cr, 'approval_request', 'fingerprint'):
+        create_column(cr, 'approval_request', 'fingerprint', 'varchar')
+    if not column_exists(cr, 'approval_request', 'duplicate_of_id'):
+        create_column(cr, 'approval_request', 'duplicate_of_id', 'int4')
@@ -1,8 +1,14 @@
 # -*- coding: utf-8 -*-
 
 from . import approval_category
+from . import approval_category_rule
 from . import approval_request
 from . import approval_approver
+from . import approval_approver_group
 from . import approval_payment_method
+from . import approval_import_job
+from . import approval_event
+from . import approval_user_counter
+from . import approval_purchase_rule
 from . import purchase_order
 
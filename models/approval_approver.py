@@ -1,7 +1,10 @@
 # -*- coding: utf-8 -*-
 
+from datetime import timedelta
+
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError, UserError
+from odoo.tools import SQL
 
 
 class ApprovalApprover(models.Model):
@@ -19,9 +22,18 @@ class ApprovalApprover(models.Model):
         ('refused', 'Refused'),
     ], string='Status', default='new', required=True, tracking=True)
     sequence = fields.Integer(string='Sequence', default=10)
+    group_id = fields.Many2one('approval.approver.group', string='Group', ondelete='set null',
+                               domain="[('category_id', '=', category_id)]")
+    rule_id = fields.Many2one('approval.category.rule', string='Routing Rule', ondelete='set null', readonly=True,
+                              help='Routing rule that added this approver; removed when the rule no longer matches')
     date = fields.Datetime(string='Date')
     comment = fields.Text(string='Comment')
     can_approve = fields.Boolean(compute='_compute_can_approve', string='Can Approve')
+    deadline = fields.Datetime(string='Escalation Deadline', copy=False, index='btree_not_null',
+                               help='Set only while the line is pending and its category escalates')
+    reminder_count = fields.Integer(string='Reminders Sent', copy=False)
+    activity_id = fields.Many2one('mail.activity', string='Activity', copy=False, ondelete='set null',
+                                  index='btree_not_null', help='To-do scheduled for this approver on submission')
 
     @api.depends('user_id', 'request_id.state', 'status', 'request_id.category_id.approval_sequence')
     def _compute_can_approve(self):
@@ -59,10 +71,16 @@ class ApprovalApprover(models.Model):
         if not self.date:
             vals['date'] = fields.Datetime.now()
         
+        self.activity_id.action_feedback(feedback=_('Approved'))
         self.write(vals)
+        self._register_decision('approved')
         
         # Check if request should be auto-approved
         self.request_id._check_auto_approval()
+        
+        # In sequential categories, the escalation delay of the next step starts now
+        if self.request_id.state == 'pending' and self.request_id.category_id.approval_sequence:
+            self.request_id.approver_ids.filtered(lambda a: not a.deadline)._filter_current_step()._arm_deadline()
 
     def action_refuse(self, comment=None):
         """Refuse the request"""
@@ -74,11 +92,21 @@ class ApprovalApprover(models.Model):
         if self.request_id.state != 'pending':
             raise UserError(_('This request is not pending approval.'))
         
+        self.activity_id.action_feedback(feedback=comment or _('Refused'))
         self.write({
             'status': 'refused',
             'date': fields.Datetime.now(),
             'comment': comment or '',
         })
+        self._register_decision('refused')
+        
+        # A refusal within a group only counts against its quorum while the request can still be approved
+        if self.group_id and self.request_id._approval_reachable():
+            self.request_id.message_post(
+                body=_('Refusal by %s recorded; group %s can still reach its quorum.') % (self.user_id.name, self.group_id.name),
+                subtype_xmlid='mail.mt_note',
+            )
+            return
         
         # Refuse the entire request - directly update state
         self.request_id.write({
@@ -87,16 +115,7 @@ class ApprovalApprover(models.Model):
         })
         
         # Send email
-        try:
-            template = self.env.ref('custom_approval.email_template_approval_request_refused_v2', raise_if_not_found=False)
-            if template:
-                if self.request_id.request_owner_id.email:
-                    template.send_mail(self.request_id.id, force_send=True, email_values={
-                        'email_to': self.request_id.request_owner_id.email,
-                        'email_from': self.request_id.company_id.email or self.env.user.email,
-                    })
-        except Exception as e:
-            self.request_id.message_post(body=_("Could not send refusal email: %s") % str(e))
+        self.request_id._send_approval_mails('refused')
         
         # Post message
         self.request_id.message_post(
@@ -104,46 +123,236 @@ class ApprovalApprover(models.Model):
             subtype_xmlid='mail.mt_note',
         )
 
-    @api.model
-    def create(self, vals):
+    @api.model_create_multi
+    def create(self, vals_list):
         """Override create to set default user and category based on request/context"""
-        # Ensure category_id is set
-        if not vals.get('category_id'):
-            # Try to get from context first
-            if self.env.context.get('default_category_id'):
-                vals['category_id'] = self.env.context.get('default_category_id')
-            # If still missing, try to get from request_id
-            elif vals.get('request_id'):
-                request = self.env['approval.request'].browse(vals['request_id'])
-                if request.exists() and request.category_id:
-                    vals['category_id'] = request.category_id.id
+        # Resolve the requests, categories and owners of all lines at once
+        requests = self.env['approval.request'].browse(
+            {vals['request_id'] for vals in vals_list if vals.get('request_id')}
+        ).exists()
+        categories = self.env['approval.category'].browse(
+            {vals['category_id'] for vals in vals_list if vals.get('category_id')}
+            | set(requests.category_id.ids)
+        )
+        managers = requests._get_owner_managers()
         
-        # For category-level approvers (templates), ensure request_id is explicitly False
-        is_category_level = False
-        if not vals.get('request_id'):
-            vals['request_id'] = False
-            is_category_level = True
+        default_category_id = self.env.context.get('default_category_id')
+        for vals in vals_list:
+            request = requests.browse(vals.get('request_id') or [])
+            
+            # Ensure category_id is set, from the context first then from the request
+            if not vals.get('category_id'):
+                if default_category_id:
+                    vals['category_id'] = default_category_id
+                elif request in requests and request.category_id:
+                    vals['category_id'] = request.category_id.id
+            
+            # For category-level approvers (templates), ensure request_id is explicitly False
+            if not vals.get('request_id'):
+                vals['request_id'] = False
+            
+            # Only set manager for request-level approvers, not category-level template approvers
+            if 'user_id' not in vals and vals['request_id'] and vals.get('category_id'):
+                category = categories.browse(vals['category_id'])
+                manager = managers.get(request.id)
+                if category.approval_type == 'manager' and manager:
+                    vals['user_id'] = manager.id
+            
+            vals.setdefault('status', 'new')
         
-        # Only set manager for request-level approvers, not category-level template approvers
-        if 'user_id' not in vals and vals.get('request_id') and vals.get('category_id'):
-            try:
-                category = self.env['approval.category'].browse(vals['category_id'])
-                if category.exists() and category.approval_type == 'manager':
-                    request = self.env['approval.request'].browse(vals['request_id'])
-                    if request.exists() and request.request_owner_id:
-                        if hasattr(request.request_owner_id, 'employee_id') and request.request_owner_id.employee_id:
-                            if request.request_owner_id.employee_id.parent_id:
-                                manager = request.request_owner_id.employee_id.parent_id.user_id
-                                if manager:
-                                    vals['user_id'] = manager.id
-            except Exception:
-                pass
+        # Category-level template lines are created as superuser, request lines as the user
+        template_indexes = [i for i, vals in enumerate(vals_list) if not vals['request_id']]
+        request_indexes = [i for i, vals in enumerate(vals_list) if vals['request_id']]
+        record_ids = [False] * len(vals_list)
+        if template_indexes:
+            templates = super(ApprovalApprover, self.sudo()).create([vals_list[i] for i in template_indexes])
+            for index, record_id in zip(template_indexes, templates.ids):
+                record_ids[index] = record_id
+        if request_indexes:
+            lines = super().create([vals_list[i] for i in request_indexes])
+            for index, record_id in zip(request_indexes, lines.ids):
+                record_ids[index] = record_id
+            self.env['approval.user.counter']._mark_dirty(
+                lines.filtered(lambda a: a.status == 'pending').user_id
+            )
+        return self.browse(record_ids)
+
+    def write(self, vals):
+        """Override write to keep the escalation deadline and pending counters in sync"""
+        if 'status' in vals or 'user_id' in vals:
+            self._mark_counters_dirty()
+        if 'status' not in vals or 'deadline' in vals:
+            res = super().write(vals)
+        else:
+            res = super().write(dict(vals, deadline=False))
+            if vals['status'] == 'pending':
+                self._filter_current_step()._arm_deadline()
+        if 'user_id' in vals:
+            self._mark_counters_dirty()
+        return res
+
+    def unlink(self):
+        self._mark_counters_dirty()
+        return super().unlink()
+
+    def _mark_counters_dirty(self):
+        """Refresh the pending counters of the lines' users, and of the users of
+        sequential requests whose current step may advance"""
+        request_lines = self.filtered('request_id')
+        users = request_lines.user_id
+        sequential = request_lines.request_id.filtered(lambda r: r.category_id.approval_sequence)
+        users |= sequential.approver_ids.user_id
+        self.env['approval.user.counter']._mark_dirty(users)
+
+    def _register_decision(self, status):
+        """Increment the stored decision counters of the lines' requests and groups.
+
+        Counters are updated in SQL so that concurrent decisions on the same
+        request add up instead of overwriting each other.
+        """
+        column = SQL.identifier('approved_count' if status == 'approved' else 'refused_count')
+        self.env['approval.request'].flush_model(['approved_count', 'refused_count'])
+        self.env['approval.request.quorum'].flush_model(['approved_count', 'refused_count'])
+        for request, approvers in self.grouped('request_id').items():
+            self.env.cr.execute(SQL(
+                "UPDATE approval_request SET %s = %s + %s WHERE id = %s",
+                column, column, len(approvers), request.id,
+            ))
+            for group, group_approvers in approvers.filtered('group_id').grouped('group_id').items():
+                self.env.cr.execute(SQL(
+                    "UPDATE approval_request_quorum SET %s = %s + %s WHERE request_id = %s AND group_id = %s",
+                    column, column, len(group_approvers), request.id, group.id,
+                ))
+        self.env['approval.request'].invalidate_model(['approved_count', 'refused_count'])
+        self.env['approval.request.quorum'].invalidate_model(['approved_count', 'refused_count'])
+
+    def _filter_current_step(self):
+        """Return the pending lines that can be decided now.
+
+        In sequential categories, a line waits until every previous line is approved.
+        """
+        return self.filtered(lambda a: a.status == 'pending' and a.request_id and (
+            not a.request_id.category_id.approval_sequence
+            or all(p.status == 'approved' for p in a.request_id.approver_ids if p.sequence < a.sequence)
+        ))
+
+    def _arm_deadline(self):
+        """(Re)start the escalation delay of pending lines"""
+        now = fields.Datetime.now()
+        for category, approvers in self.grouped('category_id').items():
+            if category.escalation_policy != 'none' and category.escalation_delay > 0:
+                approvers.write({'deadline': now + timedelta(hours=category.escalation_delay)})
+
+    @api.model
+    def _cron_escalate_pending_approvals(self, batch_size=200):
+        """Escalate pending approvals whose deadline has passed.
+
+        Only lines carrying a deadline are indexed, so each run reads the due
+        lines and nothing else of the pending backlog.
+        """
+        domain = [('deadline', '<=', fields.Datetime.now())]
+        due = self.search(domain, order='deadline, id', limit=batch_size)
+        due.with_context(approval_lean_tracking=True)._escalate()
+        remaining = self.search_count(domain) if len(due) == batch_size else 0
+        self.env['ir.cron']._notify_progress(done=len(due), remaining=remaining)
+
+    def _escalate(self):
+        """Apply the category escalation policy to overdue approver lines"""
+        stale = self.filtered(
+            lambda a: a.status != 'pending' or a.request_id.state != 'pending'
+            or a.category_id.escalation_policy == 'none'
+        )
+        stale.write({'deadline': False})
         
-        if 'status' not in vals:
-            vals['status'] = 'new'
+        # Lines waiting on a previous step get their deadline when their step starts
+        waiting = (self - stale) - (self - stale)._filter_current_step()
+        waiting.write({'deadline': False})
         
-        if is_category_level:
-            return super(ApprovalApprover, self.sudo()).create(vals)
-            
-        return super().create(vals)
+        due = self - stale - waiting
+        to_remind = due.filtered(lambda a: a.category_id.escalation_policy == 'remind')
+        to_reassign = due.filtered(lambda a: a.category_id.escalation_policy == 'reassign')
+        to_refuse = due.filtered(lambda a: a.category_id.escalation_policy == 'refuse')
+        to_remind |= to_reassign._escalation_reassign()
+        to_remind._escalation_remind()
+        to_refuse._escalation_refuse()
+
+    def _get_escalation_manager(self):
+        """Return the manager the line can be escalated to, if any"""
+        self.ensure_one()
+        employee = self.user_id.employee_id if hasattr(self.user_id, 'employee_id') else False
+        if employee and employee.parent_id and employee.parent_id.user_id:
+            return employee.parent_id.user_id
+        return self.env['res.users']
+
+    def _escalation_remind(self):
+        """Remind approvers of overdue lines and restart their delay"""
+        for request, approvers in self.grouped('request_id').items():
+            request.message_post(
+                body=_('Reminder: request %s is still waiting for your approval.') % request.name,
+                partner_ids=approvers.user_id.partner_id.ids,
+                subtype_xmlid='mail.mt_comment',
+                subject=_('Approval Reminder: %s', request.name),
+            )
+        for approver in self:
+            approver.reminder_count += 1
+        self._arm_deadline()
+
+    def _escalation_reassign(self):
+        """Reassign overdue lines to the approver's manager.
 
+        Returns the lines that could not be reassigned, to be reminded instead.
+        """
+        not_reassigned = self.browse()
+        for approver in self:
+            manager = approver._get_escalation_manager()
+            if not manager or manager in approver.request_id.approver_ids.user_id:
+                not_reassigned |= approver
+                continue
+            previous_user = approver.user_id
+            approver.activity_id.sudo().unlink()
+            activity = approver.request_id.activity_schedule(
+                'mail.mail_activity_data_todo',
+                summary=_('Approval Request: %s', approver.request_id.name),
+                note=_('Please review and approve the request: %s', approver.request_id.name),
+                user_id=manager.id,
+            )
+            approver.write({'user_id': manager.id, 'reminder_count': 0, 'activity_id': activity.id})
+            approver._arm_deadline()
+            approver.request_id.message_post(
+                body=_('Approval escalated from %s to %s after no decision was taken.') % (previous_user.name, manager.name),
+                subtype_xmlid='mail.mt_note',
+            )
+        return not_reassigned
+
+    def _escalation_refuse(self):
+        """Refuse overdue lines, and their requests unless their groups absorb the refusal"""
+        if not self:
+            return
+        reason = _('Automatically refused: no decision was taken before the escalation deadline.')
+        self.write({
+            'status': 'refused',
+            'date': fields.Datetime.now(),
+            'comment': reason,
+        })
+        self._register_decision('refused')
+        
+        # Same decision as a manual refusal: absorbed by the groups while the request can still be approved
+        absorbed = self.env['approval.request']
+        for request, approvers in self.grouped('request_id').items():
+            if all(approver.group_id for approver in approvers) and request._approval_reachable():
+                absorbed |= request
+                request.message_post(
+                    body=_('Overdue approval of %s refused automatically; its group can still reach its quorum.')
+                    % ', '.join(approvers.user_id.mapped('name')),
+                    subtype_xmlid='mail.mt_note',
+                )
+        requests = self.request_id - absorbed
+        if not requests:
+            return
+        requests.write({
+            'state': 'refused',
+            'reason': reason,
+        })
+        for request in requests:
+            request.message_post(body=reason, subtype_xmlid='mail.mt_note')
+        requests._send_approval_mails('refused')
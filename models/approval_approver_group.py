@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api, _
+from odoo.exceptions import ValidationError
+
+
+class ApprovalApproverGroup(models.Model):
+    _name = 'approval.approver.group'
+    _description = 'Approver Group'
+    _order = 'sequence, id'
+
+    name = fields.Char(string='Group', required=True)
+    sequence = fields.Integer(string='Sequence', default=10)
+    category_id = fields.Many2one('approval.category', string='Category', required=True, ondelete='cascade', index=True)
+    quorum = fields.Integer(string='Quorum', default=1, required=True,
+                            help='Number of approvals required from the approvers of this group')
+
+    @api.constrains('quorum')
+    def _check_quorum(self):
+        for group in self:
+            if group.quorum < 1:
+                raise ValidationError(_('The quorum of group "%s" must be at least 1.') % group.name)
+
+
+class ApprovalRequestQuorum(models.Model):
+    _name = 'approval.request.quorum'
+    _description = 'Approval Request Quorum'
+    _order = 'id'
+
+    request_id = fields.Many2one('approval.request', string='Request', required=True, ondelete='cascade', index=True)
+    group_id = fields.Many2one('approval.approver.group', string='Group', required=True, ondelete='cascade')
+    quorum = fields.Integer(string='Quorum', required=True)
+    member_count = fields.Integer(string='Approvers')
+    approved_count = fields.Integer(string='Approved')
+    refused_count = fields.Integer(string='Refused')
+
+    _sql_constraints = [
+        ('request_group_uniq', 'unique(request_id, group_id)', 'A group can only have one quorum per request.'),
+    ]
@@ -3,6 +3,8 @@
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError
 
+from .approval_request import DUPLICATE_SCAN_PARAM, FINGERPRINT_FIELDS
+
 
 class ApprovalCategory(models.Model):
     _name = 'approval.category'
@@ -35,23 +37,82 @@ class ApprovalCategory(models.Model):
                                          help='If enabled, the requester must also approve')
     require_employee_manager = fields.Boolean(string="Require Employee's Manager", default=False, tracking=True,
                                              help="If enabled, the employee's manager will be required as an approver")
+    escalation_policy = fields.Selection([
+        ('none', 'None'),
+        ('remind', 'Send Reminder'),
+        ('reassign', "Reassign to Approver's Manager"),
+        ('refuse', 'Refuse Automatically'),
+    ], string='Escalation', required=True, default='none', tracking=True,
+        help='Action taken when an approver has not decided before the escalation delay')
+    escalation_delay = fields.Integer(string='Escalation Delay (Hours)', default=48,
+                                      help='Hours a pending approval may wait before being escalated')
+    tracking_mode = fields.Selection([
+        ('full', 'Full'),
+        ('lean', 'Lean'),
+    ], string='Tracking', required=True, default='full',
+        help='Full: every tracked field change is logged in the chatter.\n'
+             'Lean: status transitions are logged as a single compact entry per request.')
+    duplicate_policy = fields.Selection([
+        ('none', 'Allow'),
+        ('warn', 'Warn'),
+        ('block', 'Block'),
+    ], string='Duplicates', required=True, default='warn', tracking=True,
+        help='What happens when a request is submitted with the same category, and the same amount, contact, '
+             'reference and period when the category uses them, as an already submitted request. '
+             'Changing which fields the category uses applies to draft and pending requests only.')
     request_to_validate_count = fields.Integer(compute='_compute_request_to_validate_count')
     request_count = fields.Integer(compute='_compute_request_count')
     approver_ids = fields.One2many('approval.approver', 'category_id', string='Approvers')
+    rule_ids = fields.One2many('approval.category.rule', 'category_id', string='Routing Rules')
+    approver_group_ids = fields.One2many('approval.approver.group', 'category_id', string='Approver Groups')
     request_ids = fields.One2many('approval.request', 'category_id', string='Requests')
     description = fields.Html(string='Description')
 
     @api.depends('request_ids')
     def _compute_request_count(self):
+        request_data = self.env['approval.request']._read_group(
+            [('category_id', 'in', self.ids)], ['category_id'], ['__count'],
+        )
+        request_dict = {category.id: count for category, count in request_data}
         for category in self:
-            category.request_count = len(category.request_ids)
+            category.request_count = request_dict.get(category.id, 0)
 
     @api.depends('request_ids', 'request_ids.state')
     def _compute_request_to_validate_count(self):
+        request_data = self.env['approval.request']._read_group(
+            [('category_id', 'in', self.ids), ('state', '=', 'pending')], ['category_id'], ['__count'],
+        )
+        request_dict = {category.id: count for category, count in request_data}
         for category in self:
-            category.request_to_validate_count = len(
-                category.request_ids.filtered(lambda r: r.state == 'pending')
-            )
+            category.request_to_validate_count = request_dict.get(category.id, 0)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        categories = super().create(vals_list)
+        # Purchase orders cache their default category
+        self.env.registry.clear_cache()
+        return categories
+
+    def write(self, vals):
+        res = super().write(vals)
+        if any(name in vals for name in ('name', 'active', 'company_id')):
+            self.env.registry.clear_cache()
+        # Fingerprints of open requests follow the flags; decided ones keep theirs
+        if any(name in vals for name in FINGERPRINT_FIELDS):
+            requests = self.env['approval.request'].sudo().with_context(active_test=False).search([
+                ('category_id', 'in', self.ids),
+                ('state', 'in', ('draft', 'pending')),
+            ])
+            self.env.add_to_compute(requests._fields['fingerprint'], requests)
+        # Fingerprints or policies changed: scan the existing requests again
+        if any(name in vals for name in ('duplicate_policy', *FINGERPRINT_FIELDS)):
+            self.env['ir.config_parameter'].sudo().set_param(DUPLICATE_SCAN_PARAM, 0)
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
 
     @api.constrains('approval_minimum', 'approver_ids', 'approval_type')
     def _check_approval_minimum(self):
@@ -72,6 +133,12 @@ class ApprovalCategory(models.Model):
                 if category.approval_minimum > len(category_approvers):
                     raise ValidationError(_('Minimum approvals (%d) cannot exceed the number of approvers (%d).') % (category.approval_minimum, len(category_approvers)))
 
+    @api.constrains('escalation_policy', 'escalation_delay')
+    def _check_escalation_delay(self):
+        for category in self:
+            if category.escalation_policy != 'none' and category.escalation_delay < 1:
+                raise ValidationError(_('The escalation delay must be at least one hour.'))
+
     def action_view_requests(self):
         """Open requests for this category"""
         self.ensure_one()
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+from collections import defaultdict
+
+from odoo import models, fields, api, _
+from odoo.exceptions import ValidationError
+
+
+class ApprovalCategoryRule(models.Model):
+    _name = 'approval.category.rule'
+    _description = 'Approval Routing Rule'
+    _order = 'sequence, id'
+
+    name = fields.Char(string='Rule', required=True)
+    sequence = fields.Integer(string='Sequence', default=10)
+    active = fields.Boolean(string='Active', default=True)
+    category_id = fields.Many2one('approval.category', string='Category', required=True, ondelete='cascade', index=True)
+    user_id = fields.Many2one('res.users', string='Additional Approver', required=True,
+                              help='Approver added to requests matching this rule')
+    approver_sequence = fields.Integer(string='Approver Sequence', default=100,
+                                       help='Sequence given to the approver line added by this rule')
+    currency_id = fields.Many2one('res.currency', string='Currency', required=True,
+                                  default=lambda self: self.env.company.currency_id,
+                                  help='Currency of the amounts; request amounts are converted into it')
+    amount_min = fields.Monetary(string='Amount Above', currency_field='currency_id',
+                                 help='Match requests whose amount is strictly greater than this value (0 to ignore)')
+    amount_max = fields.Monetary(string='Amount Up To', currency_field='currency_id',
+                                 help='Match requests whose amount is lower than or equal to this value (0 to ignore)')
+    partner_ids = fields.Many2many('res.partner', string='Contacts')
+    partner_category_ids = fields.Many2many('res.partner.category', string='Contact Tags')
+    product_ids = fields.Many2many('product.product', string='Products')
+    company_ids = fields.Many2many('res.company', string='Companies')
+
+    @api.constrains('amount_min', 'amount_max')
+    def _check_amounts(self):
+        for rule in self:
+            if rule.amount_min and rule.amount_max and rule.amount_min >= rule.amount_max:
+                raise ValidationError(_('The lower amount of rule "%s" must be below its upper amount.') % rule.name)
+
+    def _get_request_domain(self):
+        """Compile the rule conditions into a domain on approval.request.
+
+        Amounts are not part of the domain: requests may be in another currency
+        than the rule, see ``_match_amount``.
+        """
+        self.ensure_one()
+        domain = [('category_id', '=', self.category_id.id)]
+        if self.partner_ids:
+            domain.append(('partner_id', 'in', self.partner_ids.ids))
+        if self.partner_category_ids:
+            domain.append(('partner_id.category_id', 'in', self.partner_category_ids.ids))
+        if self.product_ids:
+            domain.append(('product_id', 'in', self.product_ids.ids))
+        if self.company_ids:
+            domain.append(('company_id', 'in', self.company_ids.ids))
+        return domain
+
+    def _match_amount(self, request):
+        """Return whether the request amount, converted into the rule currency, is within the rule bounds"""
+        self.ensure_one()
+        if not self.amount_min and not self.amount_max:
+            return True
+        amount = request.amount
+        if request.currency_id and request.currency_id != self.currency_id:
+            amount = request.currency_id._convert(
+                amount, self.currency_id, request.company_id or self.env.company,
+                request.date or fields.Date.context_today(self),
+            )
+        if self.amount_min and not self.currency_id.compare_amounts(amount, self.amount_min) > 0:
+            return False
+        if self.amount_max and self.currency_id.compare_amounts(amount, self.amount_max) > 0:
+            return False
+        return True
+
+    @api.model
+    def _match_requests(self, requests):
+        """Return {request_id: rules} for the requests matched by the active rules of their categories.
+
+        Stored requests are matched with one query per rule; new (unsaved) records
+        are matched in memory with the same domain. Amounts are then checked per request, see ``_match_amount``.
+        """
+        matches = defaultdict(lambda: self.browse())
+        if not requests:
+            return matches
+        rules = self.search([('category_id', 'in', requests.category_id.ids)])
+        stored = requests.filtered('id')
+        new = requests - stored
+        Request = self.env['approval.request'].sudo().with_context(active_test=False)
+        for rule in rules:
+            domain = rule._get_request_domain()
+            candidates = new.filtered_domain(domain)
+            if stored:
+                candidates |= Request.search([('id', 'in', stored.ids)] + domain)
+            for request in candidates:
+                if rule._match_amount(request):
+                    matches[request.id] |= rule
+        return matches
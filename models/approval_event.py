@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+
+import requests
+
+from odoo import models, fields, api
+from odoo.tools import json_default
+
+_logger = logging.getLogger(__name__)
+
+# Event type of a request state transition, by (old state, new state)
+TRANSITION_EVENT_TYPES = {
+    ('draft', 'pending'): 'confirm',
+    ('pending', 'approved'): 'approve',
+    ('pending', 'refused'): 'refuse',
+    ('pending', 'draft'): 'withdraw',
+}
+
+EVENT_FIELDS = ['request_id', 'request_name', 'event_type', 'state_from', 'state_to', 'user_id', 'company_id', 'payload', 'create_date']
+
+
+class ApprovalEvent(models.Model):
+    _name = 'approval.event'
+    _description = 'Approval Event'
+    _order = 'id'
+
+    request_id = fields.Many2one('approval.request', string='Request', ondelete='set null', index=True)
+    request_name = fields.Char(string='Request Reference')
+    event_type = fields.Selection([
+        ('confirm', 'Submitted'),
+        ('approve', 'Approved'),
+        ('refuse', 'Refused'),
+        ('withdraw', 'Withdrawn'),
+        ('cancel', 'Cancelled'),
+        ('update', 'Status Changed'),
+    ], string='Event', required=True)
+    state_from = fields.Char(string='Previous Status')
+    state_to = fields.Char(string='New Status')
+    user_id = fields.Many2one('res.users', string='User', ondelete='set null')
+    company_id = fields.Many2one('res.company', string='Company', ondelete='set null')
+    payload = fields.Json(string='Payload')
+    acknowledged = fields.Boolean(string='Acknowledged', default=False, index=True)
+
+    @api.model
+    def _create_transition_events(self, requests, old_states):
+        """Append one event per request whose state changed to the outbox"""
+        vals_list = []
+        for request in requests:
+            state_from = old_states.get(request.id)
+            if state_from == request.state:
+                continue
+            if request.state == 'cancel':
+                event_type = 'cancel'
+            else:
+                event_type = TRANSITION_EVENT_TYPES.get((state_from, request.state), 'update')
+            vals_list.append({
+                'request_id': request.id,
+                'request_name': request.name,
+                'event_type': event_type,
+                'state_from': state_from,
+                'state_to': request.state,
+                'user_id': self.env.uid,
+                'company_id': request.company_id.id,
+                'payload': request._get_event_payload(),
+            })
+        if vals_list:
+            self.sudo().create(vals_list)
+
+    @api.model
+    @api.readonly
+    def fetch_events(self, after_id=0, limit=500, unacknowledged=False):
+        """Return up to ``limit`` events after ``after_id``, oldest first.
+
+        Ids are taken when the event is written, not when its transaction
+        commits, so an event may become visible after events with a higher id.
+        The ``after_id`` cursor can therefore miss events; consumers that need
+        every event fetch the unacknowledged ones and acknowledge what they
+        processed. Delivery is at least once, ordered by id within a page.
+        """
+        domain = [('id', '>', after_id)]
+        if unacknowledged:
+            domain.append(('acknowledged', '=', False))
+        return self.search_read(domain, EVENT_FIELDS, order='id', limit=limit)
+
+    @api.model
+    def acknowledge_events(self, event_ids):
+        """Mark the given events as processed, so that they can be compacted.
+
+        Only the events the consumer actually processed are acknowledged; an
+        id range would also cover events committed after the consumer read it.
+        """
+        events = self.browse(event_ids)
+        events.check_access('write')
+        self.env.cr.execute("""
+            UPDATE approval_event
+               SET acknowledged = TRUE
+             WHERE id = ANY(%s)
+               AND NOT acknowledged
+        """, [list(events.ids)])
+        self.invalidate_model(['acknowledged'])
+        return True
+
+    @api.model
+    def _cron_push_events(self, batch_size=500):
+        """Push unacknowledged events to the configured webhook, acknowledging them on success"""
+        url = self.env['ir.config_parameter'].sudo().get_param('custom_approval.outbox_webhook_url')
+        if not url:
+            return
+        events = self.fetch_events(unacknowledged=True, limit=batch_size)
+        if not events:
+            return
+        try:
+            response = requests.post(
+                url,
+                data=json.dumps({'events': events}, default=json_default),
+                headers={'Content-Type': 'application/json'},
+                timeout=30,
+            )
+            response.raise_for_status()
+        except requests.RequestException as e:
+            _logger.warning('Could not push %s approval events to %s: %s', len(events), url, e)
+            return
+        self.acknowledge_events([event['id'] for event in events])
+        self.env['ir.cron']._notify_progress(
+            done=len(events),
+            remaining=batch_size if len(events) == batch_size else 0,
+        )
+
+    @api.model
+    def _cron_compact_events(self, retention_days=7, batch_size=10000):
+        """Delete acknowledged events older than the retention, in chunks"""
+        self.env.cr.execute("""
+            DELETE FROM approval_event
+             WHERE id IN (SELECT id FROM approval_event
+                           WHERE acknowledged
+                             AND create_date < (now() at time zone 'UTC') - make_interval(days => %s)
+                           ORDER BY id
+                           LIMIT %s)
+        """, [retention_days, batch_size])
+        deleted = self.env.cr.rowcount
+        self.invalidate_model()
+        self.env['ir.cron']._notify_progress(
+            done=deleted,
+            remaining=batch_size if deleted == batch_size else 0,
+        )
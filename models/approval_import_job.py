@@ -0,0 +1,363 @@
+# -*- coding: utf-8 -*-
+
+import csv
+import io
+import json
+import logging
+from contextlib import contextmanager
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+# Request columns read from the file; relational ones are resolved in batch
+REQUEST_COLUMNS = [
+    'name', 'date', 'date_start', 'date_end', 'quantity', 'amount', 'reference',
+    'location', 'reason', 'description', 'state',
+]
+
+# Request fields a category requires once the request has been submitted
+CATEGORY_REQUIRED_FIELDS = {
+    'has_period': ('date_start', 'date_end'),
+    'has_quantity': ('quantity',),
+    'has_amount': ('amount',),
+    'has_reference': ('reference',),
+    'has_location': ('location',),
+    'has_partner': ('partner_id',),
+    'has_product': ('product_id',),
+}
+
+# Imported history is written as is: no approver routing, notification or tracking
+IMPORT_CONTEXT = {
+    'approval_import': True,
+    'tracking_disable': True,
+    'mail_create_nolog': True,
+    'mail_notrack': True,
+}
+
+
+def _to_int(value):
+    """Return ``value`` as an integer, or None when it is empty or malformed"""
+    try:
+        return int(value) if value not in (None, '') else None
+    except (ValueError, TypeError):
+        return None
+
+
+class ApprovalImportJob(models.Model):
+    _name = 'approval.import.job'
+    _description = 'Approval Request Import'
+    _order = 'id desc'
+
+    name = fields.Char(string='Name', required=True)
+    file = fields.Binary(string='File', attachment=True, required=True)
+    filename = fields.Char(string='File Name')
+    file_type = fields.Selection([
+        ('csv', 'CSV'),
+        ('jsonl', 'JSON Lines'),
+    ], string='Format', required=True, default='csv',
+        help='CSV: one row per approver line, consecutive rows with the same name form one request.\n'
+             'JSON Lines: one request per line, approvers given as an "approvers" list.')
+    company_id = fields.Many2one('res.company', string='Default Company', required=True,
+                                 default=lambda self: self.env.company,
+                                 help='Company of the requests whose "company" column is empty')
+    batch_size = fields.Integer(string='Batch Size', default=1000, required=True)
+    state = fields.Selection([
+        ('draft', 'Draft'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], string='Status', default='draft', required=True, copy=False)
+    rows_done = fields.Integer(string='Requests Processed', copy=False, readonly=True,
+                               help='Checkpoint: number of requests of the file already processed')
+    imported_count = fields.Integer(string='Imported', copy=False, readonly=True)
+    error_count = fields.Integer(string='Rejected', copy=False, readonly=True)
+    error_log = fields.Text(string='Errors', copy=False, readonly=True)
+
+    @api.onchange('filename')
+    def _onchange_filename(self):
+        if self.filename and self.filename.lower().endswith(('.jsonl', '.ndjson', '.json')):
+            self.file_type = 'jsonl'
+        elif self.filename:
+            self.file_type = 'csv'
+
+    def action_start(self):
+        """Queue the import; it runs in the background and resumes from its checkpoint"""
+        for job in self:
+            if job.state not in ('draft', 'failed'):
+                raise UserError(_('Only draft or failed imports can be started.'))
+            if job.batch_size < 1:
+                raise UserError(_('The batch size must be positive.'))
+        self.write({'state': 'running'})
+        self.env.ref('custom_approval.ir_cron_approval_import')._trigger()
+
+    def action_reset(self):
+        """Restart the import from the beginning of the file"""
+        self.write({
+            'state': 'draft',
+            'rows_done': 0,
+            'imported_count': 0,
+            'error_count': 0,
+            'error_log': False,
+        })
+
+    @api.model
+    def _cron_process_import_jobs(self):
+        """Run the queued imports, committing after each chunk"""
+        for job in self.search([('state', '=', 'running')], order='id'):
+            try:
+                job._run()
+            except Exception as e:
+                self.env.cr.rollback()
+                _logger.exception('Approval import %s failed', job.id)
+                job.write({
+                    'state': 'failed',
+                    'error_log': (job.error_log or '') + _('Import stopped: %s') % e + '\n',
+                })
+                self.env.cr.commit()
+
+    def _run(self):
+        """Stream the file from the checkpoint and import it chunk by chunk"""
+        self.ensure_one()
+        chunk = []
+        for row in self._iter_records(skip=self.rows_done):
+            chunk.append(row)
+            if len(chunk) >= self.batch_size:
+                self._import_chunk(chunk)
+                chunk = []
+        if chunk:
+            self._import_chunk(chunk)
+        self.state = 'done'
+        self.env.cr.commit()
+
+    @contextmanager
+    def _open_file(self):
+        """Open the uploaded file as a text stream, without loading it in memory"""
+        attachment = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', self._name),
+            ('res_id', '=', self.id),
+            ('res_field', '=', 'file'),
+        ], limit=1)
+        if not attachment:
+            raise UserError(_('No file to import.'))
+        if attachment.store_fname:
+            with open(attachment._full_path(attachment.store_fname), 'rb') as binary:
+                yield io.TextIOWrapper(binary, encoding='utf-8-sig', newline='')
+        else:
+            yield io.TextIOWrapper(io.BytesIO(attachment.raw), encoding='utf-8-sig', newline='')
+
+    def _iter_records(self, skip=0):
+        """Yield one dict per request of the file, approvers included, after the first ``skip``"""
+        with self._open_file() as stream:
+            records = self._iter_csv(stream) if self.file_type == 'csv' else self._iter_jsonl(stream)
+            for position, record in enumerate(records, start=1):
+                if position > skip:
+                    record['_position'] = position
+                    yield record
+
+    def _iter_csv(self, stream):
+        current = None
+        for line in csv.DictReader(stream):
+            row = {key.strip(): (value or '').strip() for key, value in line.items() if key}
+            if current is None or row.get('name') != current.get('name'):
+                if current is not None:
+                    yield current
+                current = {key: value for key, value in row.items() if not key.startswith('approver_')}
+                current['approvers'] = []
+            if row.get('approver_login'):
+                current['approvers'].append({
+                    'login': row['approver_login'],
+                    'status': row.get('approver_status'),
+                    'date': row.get('approver_date'),
+                    'comment': row.get('approver_comment'),
+                    'sequence': row.get('approver_sequence'),
+                    'group': row.get('approver_group'),
+                })
+        if current is not None:
+            yield current
+
+    def _iter_jsonl(self, stream):
+        for line in stream:
+            if not line.strip():
+                continue
+            # A malformed line is rejected on its own instead of stopping the import
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield {'_error': _('invalid JSON: %s') % e}
+                continue
+            if not isinstance(record, dict):
+                yield {'_error': _('a JSON object is expected')}
+                continue
+            yield record
+
+    def _import_chunk(self, rows):
+        """Validate a chunk against the category configuration and insert it, then commit"""
+        prepared, errors = self._prepare_chunk(rows)
+        imported = self._insert_chunk(prepared, errors)
+        self.write({
+            'rows_done': self.rows_done + len(rows),
+            'imported_count': self.imported_count + imported,
+            'error_count': self.error_count + len(errors),
+            'error_log': (self.error_log or '') + ''.join('%s\n' % error for error in errors),
+        })
+        self.env.cr.commit()
+        self.env.invalidate_all()
+
+    def _insert_chunk(self, prepared, errors):
+        """Insert the prepared requests in one batch and return how many were imported.
+
+        When the batch fails on a database constraint, the requests are inserted
+        one by one, each in its own savepoint, and the failing ones are rejected.
+        """
+        if not prepared:
+            return 0
+        Request = self.env['approval.request'].with_context(**IMPORT_CONTEXT)
+        try:
+            with self.env.cr.savepoint():
+                Request.create([vals for row, vals in prepared])
+            return len(prepared)
+        except Exception:
+            _logger.info('Approval import %s: chunk insert failed, inserting requests one by one', self.id)
+        imported = 0
+        for row, vals in prepared:
+            try:
+                with self.env.cr.savepoint():
+                    Request.create(vals)
+                imported += 1
+            except Exception as e:
+                errors.append(_('Request %s (%s): %s') % (row.get('_position'), row.get('name') or '', e))
+        return imported
+
+    def _prepare_chunk(self, rows):
+        """Return ([(row, vals)], errors) for a chunk, resolving relations with one search each"""
+        companies = {
+            company.name: company
+            for company in self.env['res.company'].search([
+                ('name', 'in', list({row['company'] for row in rows if isinstance(row.get('company'), str)})),
+            ])
+        }
+        currencies = {
+            currency.name: currency.id
+            for currency in self.env['res.currency'].with_context(active_test=False).search([
+                ('name', 'in', list({row['currency'] for row in rows if isinstance(row.get('currency'), str)})),
+            ])
+        }
+        # Categories are matched by name within the company of the request, shared ones included
+        categories = {
+            (category.name, category.company_id.id): category
+            for category in self.env['approval.category'].with_context(active_test=False).search([
+                ('name', 'in', list({row['category'] for row in rows if isinstance(row.get('category'), str)})),
+            ])
+        }
+        # Malformed values (lists, objects) are left out here and rejected with their row
+        logins = {row['owner'] for row in rows if isinstance(row.get('owner'), str)} | {
+            approver['login']
+            for row in rows if isinstance(row.get('approvers'), list)
+            for approver in row['approvers'] if isinstance(approver, dict) and isinstance(approver.get('login'), str)
+        }
+        users = {
+            user.login: user.id
+            for user in self.env['res.users'].with_context(active_test=False).search([
+                ('login', 'in', [login for login in logins if login]),
+            ])
+        }
+        groups = {
+            (group.category_id.id, group.name): group.id
+            for group in self.env['approval.approver.group'].search([
+                ('category_id', 'in', [category.id for category in categories.values()]),
+            ])
+        }
+        partner_ids = set(self.env['res.partner'].browse(
+            {_to_int(row.get('partner_id')) for row in rows} - {None}
+        ).exists().ids)
+        product_ids = set(self.env['product.product'].browse(
+            {_to_int(row.get('product_id')) for row in rows} - {None}
+        ).exists().ids)
+        states = dict(self.env['approval.request']._fields['state'].selection)
+        statuses = dict(self.env['approval.approver']._fields['status'].selection)
+
+        prepared = []
+        errors = []
+        for row in rows:
+            try:
+                if row.get('_error'):
+                    raise ValueError(row['_error'])
+                prepared.append((row, self._prepare_request_vals(
+                    row, categories, users, partner_ids, product_ids, states, statuses, companies, currencies, groups,
+                )))
+            except (ValueError, TypeError, KeyError, AttributeError) as e:
+                errors.append(_('Request %s (%s): %s') % (row.get('_position'), row.get('name') or '', e))
+        return prepared, errors
+
+    def _prepare_request_vals(self, row, categories, users, partner_ids, product_ids, states, statuses, companies, currencies, groups):
+        company = companies.get(row['company']) if row.get('company') else self.company_id
+        if not company:
+            raise ValueError(_('unknown company "%s"') % row.get('company'))
+        currency_id = currencies.get(row['currency']) if row.get('currency') else company.currency_id.id
+        if not currency_id:
+            raise ValueError(_('unknown currency "%s"') % row.get('currency'))
+        category = categories.get((row.get('category'), company.id)) or categories.get((row.get('category'), False))
+        if not category:
+            raise ValueError(_('unknown category "%s" for company "%s"') % (row.get('category'), company.name))
+        if not users.get(row.get('owner')):
+            raise ValueError(_('unknown owner "%s"') % row.get('owner'))
+        if not row.get('name'):
+            raise ValueError(_('missing name'))
+        state = row.get('state') or 'draft'
+        if state not in states:
+            raise ValueError(_('invalid state "%s"') % state)
+
+        vals = {
+            'category_id': category.id,
+            'request_owner_id': users[row['owner']],
+            'company_id': company.id,
+            'currency_id': currency_id,
+            'state': state,
+        }
+        for column in REQUEST_COLUMNS:
+            if row.get(column) not in (None, ''):
+                vals[column] = row[column]
+        for column, known_ids in (('partner_id', partner_ids), ('product_id', product_ids)):
+            if row.get(column):
+                if int(row[column]) not in known_ids:
+                    raise ValueError(_('unknown %s %s') % (column, row[column]))
+                vals[column] = int(row[column])
+        for column in ('quantity', 'amount'):
+            if column in vals:
+                vals[column] = float(vals[column])
+        for column in ('date', 'date_start', 'date_end'):
+            if column in vals:
+                vals[column] = fields.Date.to_date(vals[column])
+
+        # Submitted requests must carry the fields their category requires
+        if state != 'draft':
+            for flag, field_names in CATEGORY_REQUIRED_FIELDS.items():
+                if category[flag] and not all(vals.get(name) for name in field_names):
+                    raise ValueError(_('%s required by category "%s"') % (', '.join(field_names), category.name))
+
+        approver_commands = []
+        for approver in row.get('approvers') or []:
+            if not users.get(approver.get('login')):
+                raise ValueError(_('unknown approver "%s"') % approver.get('login'))
+            status = approver.get('status') or 'new'
+            if status not in statuses:
+                raise ValueError(_('invalid approver status "%s"') % status)
+            group_id = groups.get((category.id, approver['group'])) if approver.get('group') else False
+            if group_id is None:
+                raise ValueError(_('unknown approver group "%s"') % approver['group'])
+            approver_commands.append((0, 0, {
+                'category_id': category.id,
+                'user_id': users[approver['login']],
+                'group_id': group_id,
+                'status': status,
+                'date': fields.Datetime.to_datetime(approver['date']) if approver.get('date') else False,
+                'comment': approver.get('comment') or False,
+                'sequence': int(approver['sequence']) if approver.get('sequence') else 10,
+            }))
+        if approver_commands:
+            vals['approver_ids'] = approver_commands
+            vals['approved_count'] = sum(1 for command in approver_commands if command[2]['status'] == 'approved')
+            vals['refused_count'] = sum(1 for command in approver_commands if command[2]['status'] == 'refused')
+        return vals
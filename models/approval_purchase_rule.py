@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api, tools
+
+
+class ApprovalPurchaseRule(models.Model):
+    _name = 'approval.purchase.rule'
+    _description = 'Purchase Approval Rule'
+    _order = 'sequence, id'
+
+    name = fields.Char(string='Rule', required=True)
+    sequence = fields.Integer(string='Sequence', default=10)
+    active = fields.Boolean(string='Active', default=True)
+    category_id = fields.Many2one('approval.category', string='Approval Category', required=True, ondelete='cascade')
+    company_id = fields.Many2one('res.company', string='Company',
+                                 help='Leave empty to apply the rule to every company')
+    amount_min = fields.Float(string='Minimum Amount',
+                              help='Orders whose total, in company currency, reaches this amount need approval')
+    partner_ids = fields.Many2many('res.partner', string='Vendors',
+                                   help='Leave empty to apply the rule to every vendor')
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        rules = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return rules
+
+    def write(self, vals):
+        res = super().write(vals)
+        self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
+
+    @api.model
+    @tools.ormcache('company_id')
+    def _get_rules_data(self, company_id):
+        """Return the active rules of a company as (category_id, amount_min, partner_ids) tuples.
+
+        Rules whose category is archived are skipped.
+        """
+        rules = self.sudo().search([('company_id', 'in', (False, company_id)), ('category_id.active', '=', True)])
+        return tuple(
+            (rule.category_id.id, rule.amount_min, frozenset(rule.partner_ids.ids))
+            for rule in rules
+        )
+
+    @api.model
+    def _match_orders(self, orders):
+        """Return {order: category_id} for the orders that need an approval request"""
+        matches = {}
+        for order in orders:
+            partner_ids = {order.partner_id.id, order.partner_id.commercial_partner_id.id}
+            amount = order.currency_id._convert(
+                order.amount_total, order.company_id.currency_id, order.company_id,
+                order.date_order or fields.Date.context_today(order),
+            )
+            for category_id, amount_min, rule_partner_ids in self._get_rules_data(order.company_id.id):
+                if amount < amount_min:
+                    continue
+                if rule_partner_ids and not rule_partner_ids & partner_ids:
+                    continue
+                matches[order] = category_id
+                break
+        return matches
@@ -1,7 +1,49 @@
 # -*- coding: utf-8 -*-
 
-from odoo import models, fields, api, _
+import hashlib
+import logging
+
+from odoo import models, fields, api, tools, _
 from odoo.exceptions import ValidationError, UserError
+from odoo.tools import SQL
+from odoo.tools.sql import create_index
+
+_logger = logging.getLogger(__name__)
+
+
+# Category fields mirrored on the request form, see get_routing_summary
+ROUTING_SUMMARY_FIELDS = [
+    'approval_minimum', 'approval_type', 'approval_sequence',
+    'has_date', 'has_period', 'has_quantity', 'has_amount', 'has_reference',
+    'has_payment_method', 'has_location', 'has_partner', 'has_product',
+]
+
+# Email templates sent on submission and decision, by kind
+MAIL_TEMPLATES = {
+    'submitted': 'custom_approval.email_template_approval_request_submitted_v2',
+    'approved': 'custom_approval.email_template_approval_request_approved_v2',
+    'refused': 'custom_approval.email_template_approval_request_refused_v2',
+}
+
+# Text searched by the full-text filter; the GIN index is built on the same expression
+SEARCH_TEXT_EXPRESSION = (
+    "to_tsvector('simple'::regconfig, regexp_replace(COALESCE(description, ''), '<[^>]*>', ' ', 'g')"
+    " || ' ' || COALESCE(reason, ''))"
+)
+
+# Category flags and the request fields they add to the duplicate fingerprint
+FINGERPRINT_FIELDS = {
+    'has_amount': ('amount', 'currency_id'),
+    'has_partner': ('partner_id',),
+    'has_reference': ('reference',),
+    'has_period': ('date_start', 'date_end'),
+}
+
+# Last request id scanned by the duplicate detection job
+DUPLICATE_SCAN_PARAM = 'custom_approval.duplicate_scan_last_id'
+
+# Request fields whose change re-evaluates the routing rules of draft requests
+ROUTING_RULE_FIELDS = ['category_id', 'request_owner_id', 'amount', 'partner_id', 'product_id', 'company_id']
 
 
 class ApprovalRequest(models.Model):
@@ -12,7 +54,7 @@ class ApprovalRequest(models.Model):
     _check_company_auto = True
 
     name = fields.Char(string='Request Reference', required=True, copy=False, readonly=True,
-                       default=lambda self: _('New'), tracking=True)
+                       default=lambda self: _('New'), tracking=True, index='trigram')
     category_id = fields.Many2one('approval.category', string='Category', required=True, tracking=True,
                                  check_company=True)
     request_owner_id = fields.Many2one('res.users', string='Request Owner', required=True,
@@ -24,7 +66,7 @@ class ApprovalRequest(models.Model):
     amount = fields.Monetary(string='Amount', currency_field='currency_id', tracking=True)
     currency_id = fields.Many2one('res.currency', string='Currency',
                                   default=lambda self: self.env.company.currency_id)
-    reference = fields.Char(string='Reference', tracking=True)
+    reference = fields.Char(string='Reference', tracking=True, index='trigram')
     partner_id = fields.Many2one('res.partner', string='Contact', tracking=True)
     location = fields.Char(string='Location', tracking=True)
     product_id = fields.Many2one('product.product', string='Product', tracking=True)
@@ -51,11 +93,24 @@ class ApprovalRequest(models.Model):
         ('cancel', 'Cancelled'),
     ], string='Request Status', compute='_compute_request_status')
     approver_ids = fields.One2many('approval.approver', 'request_id', string='Approvers', copy=True)
+    approved_count = fields.Integer(string='Approvals', readonly=True, copy=False,
+                                    help='Approved lines, maintained incrementally on each decision')
+    refused_count = fields.Integer(string='Refusals', readonly=True, copy=False,
+                                   help='Refused lines, maintained incrementally on each decision')
+    quorum_ids = fields.One2many('approval.request.quorum', 'request_id', string='Quorums', readonly=True)
     has_access_to_request = fields.Boolean(compute='_compute_has_access_to_request', store=False)
     request_link = fields.Char(string='Request Link', compute='_compute_request_link', store=False)
     attachment_number = fields.Integer(compute='_compute_attachment_number', string='Number of Attachments')
     description = fields.Html(string='Description', tracking=True)
     reason = fields.Text(string='Reason', tracking=True)
+    fingerprint = fields.Char(string='Fingerprint', compute='_compute_fingerprint', store=True, copy=False,
+                              index='btree_not_null',
+                              help='Hash of the fields enabled on the category, shared by duplicate requests')
+    duplicate_of_id = fields.Many2one('approval.request', string='Possible Duplicate Of', readonly=True, copy=False,
+                                      index='btree_not_null')
+    search_text = fields.Char(string='Description or Reason', compute='_compute_search_text',
+                              search='_search_search_text',
+                              help='Full-text search on the words of the description and the reason')
     approval_minimum = fields.Integer(related='category_id.approval_minimum', string='Minimum Approvals', readonly=True)
     approval_type = fields.Selection(related='category_id.approval_type', string='Approval Type', readonly=True)
     approval_sequence = fields.Boolean(related='category_id.approval_sequence', string='Sequential Approval', readonly=True)
@@ -69,6 +124,24 @@ class ApprovalRequest(models.Model):
     has_partner = fields.Boolean(related='category_id.has_partner', string='Has Contact', readonly=True)
     has_product = fields.Boolean(related='category_id.has_product', string='Has Product', readonly=True)
 
+    def _auto_init(self):
+        # Trigram indexes on name and reference need pg_trgm; without it they
+        # are skipped and substring searches fall back to sequential scans
+        if not self.pool.has_trigram:
+            try:
+                with self.env.cr.savepoint(flush=False), tools.mute_logger('odoo.sql_db'):
+                    self.env.cr.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+                self.pool.has_trigram = True
+            except Exception:
+                _logger.warning('Extension pg_trgm is not available; approval requests are searched without trigram indexes.')
+        return super()._auto_init()
+
+    def init(self):
+        create_index(
+            self.env.cr, 'approval_request_search_text_index', self._table,
+            [SEARCH_TEXT_EXPRESSION], method='gin',
+        )
+
     @api.depends('state')
     def _compute_request_status(self):
         """Map state to request_status"""
@@ -78,6 +151,42 @@ class ApprovalRequest(models.Model):
             else:
                 request.request_status = request.state
 
+    @api.depends('category_id', 'company_id', 'amount', 'currency_id', 'partner_id', 'reference',
+                 'date_start', 'date_end')
+    def _compute_fingerprint(self):
+        # Category flags are not dependencies: changing one would rewrite the whole
+        # history of the category, see ApprovalCategory.write
+        for request in self:
+            category = request.category_id
+            field_names = [name for flag, names in FINGERPRINT_FIELDS.items() if category[flag] for name in names]
+            if not field_names:
+                request.fingerprint = False
+                continue
+            values = [category.id, request.company_id.id]
+            for name in field_names:
+                value = request[name]
+                if isinstance(value, models.BaseModel):
+                    value = value.id
+                elif name == 'amount' and request.currency_id:
+                    value = request.currency_id.round(value)
+                elif name == 'reference':
+                    value = (value or '').strip().lower()
+                values.append(value or '')
+            key = '|'.join(str(value) for value in values)
+            request.fingerprint = hashlib.sha1(key.encode()).hexdigest()
+
+    def _compute_search_text(self):
+        self.search_text = False
+
+    def _search_search_text(self, operator, value):
+        if operator not in ('ilike', 'not ilike', '=', '!=') or not isinstance(value, str):
+            raise UserError(_('Unsupported search on description or reason.'))
+        query = SQL(
+            "SELECT id FROM approval_request WHERE %s @@ plainto_tsquery('simple'::regconfig, %s)",
+            SQL(SEARCH_TEXT_EXPRESSION), value,
+        )
+        return [('id', 'in' if operator in ('ilike', '=') else 'not in', query)]
+
     @api.depends('request_owner_id', 'approver_ids.user_id')
     def _compute_has_access_to_request(self):
         """Check if current user has access to this request"""
@@ -106,42 +215,173 @@ class ApprovalRequest(models.Model):
         for request in self:
             request.attachment_number = attachment_dict.get(request.id, 0)
 
-    @api.model
-    def create(self, vals):
+    @api.model_create_multi
+    def create(self, vals_list):
         """Override create to generate sequence and create approvers"""
-        if vals.get('name', _('New')) == _('New'):
-            vals['name'] = self.env['ir.sequence'].next_by_code('approval.request') or _('New')
+        for vals in vals_list:
+            if vals.get('name', _('New')) == _('New'):
+                vals['name'] = self.env['ir.sequence'].next_by_code('approval.request') or _('New')
+        
+        if self.env.context.get('approval_lean_tracking'):
+            requests = super(ApprovalRequest, self.with_context(mail_create_nolog=True, mail_notrack=True)).create(vals_list)
+            requests._message_log_batch(bodies={request.id: _('Request created.') for request in requests})
+            requests = requests.with_env(self.env)
+        else:
+            requests = super().create(vals_list)
         
-        request = super().create(vals)
+        # Imported history keeps exactly the approvers it comes with
+        if self.env.context.get('approval_import'):
+            requests._import_quorums()
+            return requests
         
-        # Create approvers based on category if not already provided (e.g. via UI onchange)
-        if not vals.get('approver_ids'):
-            request._create_approvers()
+        # Create approvers based on category if not already provided (e.g. added manually on the form)
+        to_route = self.browse()
+        for request, vals in zip(requests, vals_list):
+            if not vals.get('approver_ids'):
+                request._create_approvers()
+                to_route |= request
         
-        return request
+        # Routing rules are resolved for the whole batch at once
+        to_route._sync_rule_approvers()
+        
+        return requests
 
-    @api.onchange('category_id')
-    def _onchange_category_id(self):
-        """Update approvers when category changes"""
-        if self.category_id:
-            # Store current approver IDs for comparison
-            existing_approvers = [(5, 0, 0)]  # Command to clear all approvers
-            self.approver_ids = existing_approvers
-            
-            # Prepare approver data based on category
-            approver_data = self._prepare_approver_data()
-            self.approver_ids = approver_data
-
-    @api.onchange('request_owner_id')
-    def _onchange_request_owner_id(self):
-        """Update approvers when request owner changes (for manager-based approvals)"""
-        if self.category_id and self.category_id.approval_type in ('manager', 'both'):
-            # Refresh approvers
-            approver_data = self._prepare_approver_data()
-            self.approver_ids = approver_data
+    def write(self, vals):
+        """Override write to log lean-tracked changes and publish state transitions"""
+        old_states = {request.id: request.state for request in self} if 'state' in vals else {}
+        lean = self._filter_lean_tracking(vals)
+        if not lean:
+            res = super().write(vals)
+        else:
+            full = self - lean
+            if full:
+                super(ApprovalRequest, full).write(vals)
+            res = super(ApprovalRequest, lean.with_context(mail_notrack=True)).write(vals)
+            lean._log_lean_tracking(vals, old_states)
+        
+        # Transitions are appended to the outbox in the same transaction
+        if old_states:
+            self.env['approval.event']._create_transition_events(self, old_states)
+            self.env['approval.user.counter']._mark_dirty(self.approver_ids.user_id)
+            approved_purchases = self.filtered(lambda r: r.state == 'approved' and r.res_model == 'purchase.order')
+            if approved_purchases:
+                self.env['purchase.order']._release_approved_orders(approved_purchases)
+        
+        # Approvers are built on save, the form only previews them
+        if 'approver_ids' not in vals:
+            drafts = self.filtered(lambda r: r.state == 'draft')
+            if 'category_id' in vals:
+                rebuild = drafts
+            elif 'request_owner_id' in vals:
+                # Only the approvers derived from the owner depend on it
+                rebuild = drafts.filtered(lambda r: r.category_id.approval_type in ('manager', 'both')
+                                          or r.category_id.require_employee_manager
+                                          or r.category_id.require_my_approval)
+            else:
+                rebuild = self.browse()
+            for request in rebuild:
+                request._create_approvers()
+            if any(name in vals for name in ROUTING_RULE_FIELDS):
+                drafts._sync_rule_approvers()
+        
+        # Approver activities are only meaningful while the request is pending
+        if vals.get('state', 'pending') != 'pending':
+            self._close_approver_activities()
+        return res
+
+    def _filter_lean_tracking(self, vals):
+        """Return the requests whose tracked changes in ``vals`` are logged in lean mode.
+
+        The ``approval_lean_tracking`` context key makes every change lean (imports,
+        syncs, crons); otherwise lean categories only compact status transitions.
+        """
+        if self.env.context.get('mail_notrack') or self.env.context.get('tracking_disable'):
+            return self.browse()
+        if not any(getattr(self._fields.get(name), 'tracking', False) for name in vals):
+            return self.browse()
+        if self.env.context.get('approval_lean_tracking'):
+            return self
+        if 'state' not in vals:
+            return self.browse()
+        return self.filtered(lambda r: r.category_id.tracking_mode == 'lean')
+
+    def _log_lean_tracking(self, vals, old_states):
+        """Log one compact audit entry per request for a lean-tracked write"""
+        state_labels = dict(self._fields['state']._description_selection(self.env))
+        changed = [
+            self._fields[name].get_description(self.env)['string']
+            for name in vals
+            if name != 'state' and getattr(self._fields.get(name), 'tracking', False)
+        ]
+        bodies = {}
+        for request in self:
+            parts = []
+            if 'state' in vals and old_states.get(request.id) != request.state:
+                parts.append(_('Status: %s → %s') % (state_labels.get(old_states.get(request.id)), state_labels.get(request.state)))
+            if changed:
+                parts.append(_('Updated: %s') % ', '.join(changed))
+            if parts:
+                bodies[request.id] = ' | '.join(parts)
+        if bodies:
+            self.browse(list(bodies))._message_log_batch(bodies=bodies)
+
+    @api.model
+    @api.readonly
+    def get_routing_summary(self, category_id, owner_id=False):
+        """Return what the request form needs to render a category and owner locally.
+
+        The form caches the result per category and owner, so changing either
+        field does not need an onchange round trip; approvers are created on save.
+        """
+        category = self.env['approval.category'].browse(category_id).exists()
+        if not category:
+            return {}
+        request = self.new({'category_id': category.id, 'request_owner_id': owner_id})
+        approvers = sorted(
+            (cmd[2] for cmd in request._prepare_approver_data() if cmd[0] == 0),
+            key=lambda vals: vals['sequence'],
+        )
+        users = self.env['res.users'].browse([vals['user_id'] for vals in approvers])
+        names = {user.id: user.display_name for user in users}
+        return {
+            'fields': {name: category[name] for name in ROUTING_SUMMARY_FIELDS},
+            'approvers': [
+                {'user_id': vals['user_id'], 'name': names.get(vals['user_id'], ''), 'sequence': vals['sequence']}
+                for vals in approvers
+            ],
+            'rules': [
+                {'name': rule.name, 'user_name': rule.user_id.display_name}
+                for rule in category.rule_ids
+            ],
+        }
+
+    @api.model
+    @api.readonly
+    def get_kanban_counters(self, domain):
+        """Return request counts per state and per category from a single grouped query"""
+        states = {}
+        categories = {}
+        for state, category, count in self._read_group(domain, ['state', 'category_id'], ['__count']):
+            states[state] = states.get(state, 0) + count
+            if category:
+                name, total = categories.get(category.id, (category.display_name, 0))
+                categories[category.id] = (name, total + count)
+        return {
+            'states': [
+                {'state': value, 'name': label, 'count': states.get(value, 0)}
+                for value, label in self._fields['state']._description_selection(self.env)
+            ],
+            'categories': sorted(
+                ({'id': category_id, 'name': name, 'count': count} for category_id, (name, count) in categories.items()),
+                key=lambda category: -category['count'],
+            ),
+        }
 
     def _prepare_approver_data(self):
-        """Prepare approver data based on category configuration"""
+        """Prepare approver data based on category configuration.
+
+        Routing rule approvers are not included, see ``_sync_rule_approvers``.
+        """
         self.ensure_one()
         if not self.category_id:
             return [(5, 0, 0)]  # Clear approvers
@@ -161,6 +401,7 @@ class ApprovalRequest(models.Model):
                 approver_commands.append((0, 0, {
                     'category_id': category.id,
                     'user_id': approver.user_id.id,
+                    'group_id': approver.group_id.id,
                     'sequence': approver.sequence,
                     'status': 'new',
                 }))
@@ -191,6 +432,7 @@ class ApprovalRequest(models.Model):
                 approver_commands.append((0, 0, {
                     'category_id': category.id,
                     'user_id': approver.user_id.id,
+                    'group_id': approver.group_id.id,
                     'sequence': approver.sequence + 10,
                     'status': 'new',
                 }))
@@ -243,6 +485,7 @@ class ApprovalRequest(models.Model):
                     'request_id': self.id,
                     'category_id': category.id,
                     'user_id': approver.user_id.id,
+                    'group_id': approver.group_id.id,
                     'sequence': approver.sequence,
                     'status': 'new',
                 })
@@ -282,6 +525,7 @@ class ApprovalRequest(models.Model):
                     'request_id': self.id,
                     'category_id': category.id,
                     'user_id': approver.user_id.id,
+                    'group_id': approver.group_id.id,
                     'sequence': approver.sequence + 10,
                     'status': 'new',
                 })
@@ -318,8 +562,46 @@ class ApprovalRequest(models.Model):
                 'status': 'new',
             })
 
+    def _get_owner_managers(self):
+        """Return {request_id: user} with the manager of each request owner, when known"""
+        if 'employee_id' not in self.env['res.users']._fields:
+            return {}
+        return {
+            request.id: request.request_owner_id.employee_id.parent_id.user_id
+            for request in self
+            if request.request_owner_id.employee_id.parent_id.user_id
+        }
+
+    def _sync_rule_approvers(self):
+        """Add the approvers of matching routing rules to the requests and remove
+        those added by rules that no longer match, in batch"""
+        matches = self.env['approval.category.rule']._match_requests(self)
+        to_remove = self.env['approval.approver']
+        vals_list = []
+        for request in self:
+            rules = matches[request.id]
+            obsolete = request.approver_ids.filtered(lambda a: a.rule_id and a.rule_id not in rules)
+            to_remove |= obsolete
+            existing_users = (request.approver_ids - obsolete).user_id
+            for rule in rules:
+                if rule.user_id in existing_users:
+                    continue
+                existing_users |= rule.user_id
+                vals_list.append({
+                    'request_id': request.id,
+                    'category_id': request.category_id.id,
+                    'user_id': rule.user_id.id,
+                    'rule_id': rule.id,
+                    'sequence': rule.approver_sequence,
+                    'status': 'new',
+                })
+        to_remove.unlink()
+        if vals_list:
+            self.env['approval.approver'].create(vals_list)
+
     def action_confirm(self):
         """Submit the request for approval"""
+        self._check_duplicates()
         for request in self:
             if request.state != 'draft':
                 raise UserError(_('Only draft requests can be submitted.'))
@@ -330,8 +612,9 @@ class ApprovalRequest(models.Model):
             # Validate required fields
             request._validate_required_fields()
             
-            # Set approvers to pending
+            # Set approvers to pending and reset the decision counters
             request.approver_ids.write({'status': 'pending'})
+            request._init_quorums()
             
             # Change state to pending
             request.write({'state': 'pending'})
@@ -344,20 +627,38 @@ class ApprovalRequest(models.Model):
                 body=_('Request submitted for approval.'),
                 subtype_xmlid='mail.mt_note',
             )
-            
-            # Send email
-            try:
-                template = self.env.ref('custom_approval.email_template_approval_request_submitted_v2', raise_if_not_found=False)
-                if template:
-                    email_to = ','.join(request.approver_ids.filtered(lambda a: a.user_id.email).mapped('user_id.email'))
-                    if email_to:
-                        template.send_mail(request.id, force_send=True, email_values={
-                            'email_to': email_to,
-                            'email_from': request.company_id.email or request.request_owner_id.email,
-                        })
-            except Exception as e:
-                # Log error but don't crash the whole transaction
-                request.message_post(body=_("Could not send submission email: %s") % str(e))
+        
+        # Send emails, rendered for all requests at once
+        self._send_approval_mails('submitted')
+
+    def _check_duplicates(self):
+        """Warn about or block requests duplicating a submitted one.
+
+        All the fingerprints are looked up with a single indexed search; within
+        the recordset, the first request of a fingerprint counts as the original.
+        """
+        requests = self.filtered(lambda r: r.fingerprint and r.category_id.duplicate_policy != 'none')
+        if not requests:
+            return
+        originals = {}
+        for original in self.sudo().search([
+            ('fingerprint', 'in', list(set(requests.mapped('fingerprint')))),
+            ('id', 'not in', requests.ids),
+            ('state', 'in', ('pending', 'approved')),
+        ], order='id'):
+            originals.setdefault(original.fingerprint, original)
+        for request in requests:
+            original = originals.setdefault(request.fingerprint, request)
+            if original == request:
+                continue
+            if request.category_id.duplicate_policy == 'block':
+                raise UserError(_('Request %s duplicates request %s, which has already been submitted.') % (
+                    request.name, original.name))
+            request.duplicate_of_id = original
+            request.message_post(
+                body=_('This request may duplicate request %s.') % original.name,
+                subtype_xmlid='mail.mt_note',
+            )
 
     def action_approve(self):
         """Approve the request"""
@@ -385,11 +686,12 @@ class ApprovalRequest(models.Model):
             
             approver.action_refuse(comment)
             
-            # Post message
-            request.message_post(
-                body=_('Request refused.') + (f'\n{comment}' if comment else ''),
-                subtype_xmlid='mail.mt_note',
-            )
+            # Post message, unless the refusal was absorbed by a group quorum
+            if request.state == 'refused':
+                request.message_post(
+                    body=_('Request refused.') + (f'\n{comment}' if comment else ''),
+                    subtype_xmlid='mail.mt_note',
+                )
 
     def action_refuse_wizard(self):
         """Open refuse wizard"""
@@ -426,8 +728,9 @@ class ApprovalRequest(models.Model):
             if request.request_owner_id != self.env.user:
                 raise UserError(_('Only the request owner can withdraw the request.'))
             
-            request.write({'state': 'draft'})
+            request.write({'state': 'draft', 'approved_count': 0, 'refused_count': 0})
             request.approver_ids.write({'status': 'new'})
+            request.quorum_ids.sudo().unlink()
             
             # Post message
             request.message_post(
@@ -436,31 +739,131 @@ class ApprovalRequest(models.Model):
             )
 
     def _check_auto_approval(self):
-        """Check if request should be auto-approved based on minimum approvals"""
-        self.ensure_one()
-        if self.state != 'pending':
+        """Check if requests should be auto-approved based on minimum approvals"""
+        # Stored counters: no need to load the approver lines
+        approved = self.filtered(lambda request: request.state == 'pending' and (
+            request.approved_count >= request.approval_minimum
+            and all(quorum.approved_count >= quorum.quorum for quorum in request.quorum_ids)
+        ))
+        if not approved:
             return
         
-        approved_count = len(self.approver_ids.filtered(lambda a: a.status == 'approved'))
-        
-        if approved_count >= self.approval_minimum:
-            self.write({'state': 'approved'})
-            self.message_post(
+        approved.write({'state': 'approved'})
+        for request in approved:
+            request.message_post(
                 body=_('Request automatically approved.'),
                 subtype_xmlid='mail.mt_note',
             )
-            
-            # Send email
-            try:
-                template = self.env.ref('custom_approval.email_template_approval_request_approved_v2', raise_if_not_found=False)
-                if template:
-                    if self.request_owner_id.email:
-                        template.send_mail(self.id, force_send=True, email_values={
-                            'email_to': self.request_owner_id.email,
-                            'email_from': self.company_id.email or self.env.user.email,
-                        })
-            except Exception as e:
-                self.message_post(body=_("Could not send approval email: %s") % str(e))
+        
+        # Send emails, rendered for all requests at once
+        approved._send_approval_mails('approved')
+
+    def _get_approval_mail_values(self, kind):
+        """Return the recipients and sender of the ``kind`` email of the request"""
+        self.ensure_one()
+        if kind == 'submitted':
+            email_to = ','.join(self.approver_ids.filtered(lambda a: a.user_id.email).mapped('user_id.email'))
+            email_from = self.company_id.email or self.request_owner_id.email
+        else:
+            email_to = self.request_owner_id.email
+            email_from = self.company_id.email or self.env.user.email
+        return {'email_to': email_to, 'email_from': email_from}
+
+    def _send_approval_mails(self, kind):
+        """Send the ``kind`` email of the requests.
+
+        The template is rendered for the whole recordset in one pass, sharing
+        prefetching of categories, owners and companies, and the mails are
+        created in one batch. A single mail is sent right away, larger batches
+        are left to the mail queue.
+        """
+        template = self.env.ref(MAIL_TEMPLATES[kind], raise_if_not_found=False)
+        if not template or not self:
+            return
+        mail_values = {request.id: request._get_approval_mail_values(kind) for request in self}
+        requests = self.filtered(lambda r: mail_values[r.id]['email_to'])
+        if not requests:
+            return
+        try:
+            with self.env.cr.savepoint():
+                rendered = template._generate_template(requests.ids, ('subject', 'body_html'))
+                mails = self.env['mail.mail'].sudo().create([{
+                    'subject': rendered[request.id].get('subject'),
+                    'body_html': rendered[request.id].get('body_html'),
+                    'email_to': mail_values[request.id]['email_to'],
+                    'email_from': mail_values[request.id]['email_from'],
+                    'model': self._name,
+                    'res_id': request.id,
+                    'auto_delete': template.auto_delete,
+                    'mail_server_id': template.mail_server_id.id,
+                } for request in requests])
+        except Exception as e:
+            # Log error but don't crash the whole transaction
+            _logger.warning('Could not send %s approval emails: %s', kind, e)
+            requests._message_log_batch(bodies={
+                request.id: _('Could not send %s email: %s') % (kind, e) for request in requests
+            })
+            return
+        if len(mails) == 1:
+            mails.send()
+
+    def _init_quorums(self):
+        """Reset the decision counters and create one quorum per approver group of the request"""
+        self.ensure_one()
+        self.quorum_ids.sudo().unlink()
+        self.write({'approved_count': 0, 'refused_count': 0})
+        members = self.env['approval.approver']._read_group(
+            [('request_id', '=', self.id), ('group_id', '!=', False)], ['group_id'], ['__count'],
+        )
+        for group, count in members:
+            if count < group.quorum:
+                raise UserError(_('Approver group "%s" requires %d approvals but only has %d approvers.') % (group.name, group.quorum, count))
+        self.env['approval.request.quorum'].sudo().create([{
+            'request_id': self.id,
+            'group_id': group.id,
+            'quorum': group.quorum,
+            'member_count': count,
+        } for group, count in members])
+
+    def _import_quorums(self):
+        """Create the quorums of imported pending requests from the decisions they come with"""
+        pending = self.filtered(lambda r: r.state == 'pending')
+        if not pending:
+            return
+        quorums = {}
+        for request, group, status, count in self.env['approval.approver']._read_group(
+            [('request_id', 'in', pending.ids), ('group_id', '!=', False)],
+            ['request_id', 'group_id', 'status'], ['__count'],
+        ):
+            vals = quorums.setdefault((request.id, group.id), {
+                'request_id': request.id,
+                'group_id': group.id,
+                'quorum': group.quorum,
+                'member_count': 0,
+                'approved_count': 0,
+                'refused_count': 0,
+            })
+            vals['member_count'] += count
+            if status in ('approved', 'refused'):
+                vals['%s_count' % status] += count
+        self.env['approval.request.quorum'].sudo().create(list(quorums.values()))
+
+    def _approval_reachable(self):
+        """Whether the request can still be approved despite the refusals so far.
+
+        The remaining approvers must be able to reach the minimum approvals and
+        every group its quorum. In sequential categories a refused line blocks
+        the following steps, so a refusal always ends the request.
+        """
+        self.ensure_one()
+        if self.category_id.approval_sequence:
+            return False
+        if len(self.approver_ids) - self.refused_count < self.approval_minimum:
+            return False
+        return all(
+            quorum.member_count - quorum.refused_count >= quorum.quorum
+            for quorum in self.quorum_ids
+        )
 
     def _validate_required_fields(self):
         """Validate required fields based on category configuration"""
@@ -527,15 +930,114 @@ class ApprovalRequest(models.Model):
             subject=_('Approval Request: %s', self.name),
         )
         
-        # Create activity for each approver
+        # Create activity for each approver, keeping track of it on the approver line
         for approver in approvers:
-            self.activity_schedule(
+            approver.activity_id = self.activity_schedule(
                 'mail.mail_activity_data_todo',
                 summary=_('Approval Request: %s', self.name),
                 note=_('Please review and approve the request: %s', self.name),
                 user_id=approver.user_id.id,
             )
 
+    def _get_event_payload(self):
+        """Compact description of the request published with its outbox events"""
+        self.ensure_one()
+        return {
+            'category_id': self.category_id.id,
+            'category': self.category_id.name,
+            'request_owner_id': self.request_owner_id.id,
+            'amount': self.amount,
+            'currency': self.currency_id.name,
+            'partner_id': self.partner_id.id,
+            'res_model': self.res_model,
+            'res_id': self.res_id,
+            'reason': self.reason or False,
+        }
+
+    def _close_approver_activities(self):
+        """Remove the activities still open for the approvers of the requests, in batch"""
+        activities = self.approver_ids.activity_id
+        if activities:
+            activities.sudo().unlink()
+
+    @api.model
+    def _cron_flag_duplicates(self, batch_size=1000):
+        """Flag submitted requests duplicating an earlier one, in chunks.
+
+        The scan resumes after the last request id it checked; it starts over
+        when the duplicate settings of a category change.
+        """
+        params = self.env['ir.config_parameter'].sudo()
+        last_id = int(params.get_param(DUPLICATE_SCAN_PARAM, 0))
+        self.env.flush_all()
+        self.env.cr.execute("""
+            SELECT req.id,
+                   (SELECT orig.id FROM approval_request orig
+                     WHERE orig.fingerprint = req.fingerprint
+                       AND orig.id < req.id
+                       AND orig.state IN ('pending', 'approved')
+                     ORDER BY orig.id
+                     LIMIT 1)
+              FROM approval_request req
+              JOIN approval_category cat ON cat.id = req.category_id
+             WHERE req.id > %(last_id)s
+               AND req.fingerprint IS NOT NULL
+               AND req.duplicate_of_id IS NULL
+               AND req.state IN ('pending', 'approved')
+               AND cat.duplicate_policy != 'none'
+             ORDER BY req.id
+             LIMIT %(limit)s
+        """, {'last_id': last_id, 'limit': batch_size})
+        rows = self.env.cr.fetchall()
+        duplicates = [(request_id, original_id) for request_id, original_id in rows if original_id]
+        if duplicates:
+            self.env.cr.execute("""
+                UPDATE approval_request req
+                   SET duplicate_of_id = dup.original_id
+                  FROM unnest(%s::int[], %s::int[]) AS dup(request_id, original_id)
+                 WHERE req.id = dup.request_id
+            """, [[row[0] for row in duplicates], [row[1] for row in duplicates]])
+            self.invalidate_model(['duplicate_of_id'])
+        if rows:
+            params.set_param(DUPLICATE_SCAN_PARAM, rows[-1][0])
+        self.env['ir.cron']._notify_progress(
+            done=len(rows),
+            remaining=batch_size if len(rows) == batch_size else 0,
+        )
+
+    @api.model
+    def _gc_approval_activities(self, batch_size=1000):
+        """Remove stale approver activities left by earlier versions, in chunks.
+
+        An activity is stale when it is a to-do of an approver of the request
+        whose line is no longer pending, or whose request is no longer pending.
+        """
+        activity_type = self.env.ref('mail.mail_activity_data_todo', raise_if_not_found=False)
+        if not activity_type:
+            return
+        self.env.flush_all()
+        self.env.cr.execute("""
+            SELECT act.id
+              FROM mail_activity act
+              JOIN approval_request req ON req.id = act.res_id
+             WHERE act.res_model = 'approval.request'
+               AND act.activity_type_id = %(type_id)s
+               AND act.active
+               AND EXISTS (SELECT 1 FROM approval_approver app
+                            WHERE app.request_id = req.id AND app.user_id = act.user_id)
+               AND (req.state != 'pending'
+                    OR NOT EXISTS (SELECT 1 FROM approval_approver app
+                                    WHERE app.request_id = req.id AND app.user_id = act.user_id
+                                      AND app.status = 'pending'))
+             ORDER BY act.id
+             LIMIT %(limit)s
+        """, {'type_id': activity_type.id, 'limit': batch_size})
+        activity_ids = [row[0] for row in self.env.cr.fetchall()]
+        self.env['mail.activity'].sudo().browse(activity_ids).unlink()
+        # One-off cleanup: the cron deactivates itself once the backlog is gone
+        remaining = batch_size if len(activity_ids) == batch_size else 0
+        self.env['ir.cron']._notify_progress(done=len(activity_ids), remaining=remaining, deactivate=not remaining)
+
     def action_get_attachment_view(self):
         """Open attachment view"""
         self.ensure_one()
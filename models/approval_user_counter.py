@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api
+
+PRECOMMIT_KEY = 'approval.user.counter.dirty'
+
+
+class ApprovalUserCounter(models.Model):
+    _name = 'approval.user.counter'
+    _description = 'Approval Pending Counter'
+    _log_access = False
+
+    user_id = fields.Many2one('res.users', string='User', required=True, ondelete='cascade')
+    pending_count = fields.Integer(string='Waiting for Approval')
+
+    _sql_constraints = [
+        ('user_uniq', 'unique(user_id)', 'A user can only have one pending approval counter.'),
+    ]
+
+    @api.model
+    @api.readonly
+    def get_my_pending_count(self):
+        """Return the number of requests waiting for the current user, from the cache"""
+        self.env.cr.execute("SELECT pending_count FROM approval_user_counter WHERE user_id = %s", [self.env.uid])
+        row = self.env.cr.fetchone()
+        if row:
+            return row[0]
+        return self._count_pending([self.env.uid]).get(self.env.uid, 0)
+
+    @api.model
+    def _count_pending(self, user_ids):
+        """Count, per user, the approver lines the user can act on right now.
+
+        This mirrors approval.approver.can_approve: pending line of a pending
+        request, and in sequential categories every previous line approved.
+        """
+        self.env.cr.execute("""
+            SELECT app.user_id, COUNT(*)
+              FROM approval_approver app
+              JOIN approval_request req ON req.id = app.request_id
+              JOIN approval_category cat ON cat.id = req.category_id
+             WHERE app.user_id = ANY(%s)
+               AND app.status = 'pending'
+               AND req.state = 'pending'
+               AND (NOT COALESCE(cat.approval_sequence, FALSE)
+                    OR NOT EXISTS (SELECT 1 FROM approval_approver prev
+                                    WHERE prev.request_id = app.request_id
+                                      AND prev.sequence < app.sequence
+                                      AND prev.status != 'approved'))
+             GROUP BY app.user_id
+        """, [list(user_ids)])
+        return dict(self.env.cr.fetchall())
+
+    @api.model
+    def _mark_dirty(self, users):
+        """Refresh the counters of ``users`` once, when the transaction commits"""
+        if not users:
+            return
+        dirty = self.env.cr.precommit.data.setdefault(PRECOMMIT_KEY, set())
+        if not dirty:
+            self.env.cr.precommit.add(self._refresh_dirty)
+        dirty.update(users.ids)
+
+    def _refresh_dirty(self):
+        user_ids = self.env.cr.precommit.data.pop(PRECOMMIT_KEY, set())
+        if not user_ids:
+            return
+        self.env.flush_all()
+        counts = self._count_pending(user_ids)
+        user_ids = sorted(user_ids)
+        self.env.cr.execute("""
+            INSERT INTO approval_user_counter (user_id, pending_count)
+            SELECT * FROM unnest(%s::int[], %s::int[])
+            ON CONFLICT (user_id) DO UPDATE SET pending_count = EXCLUDED.pending_count
+        """, [user_ids, [counts.get(user_id, 0) for user_id in user_ids]])
+        self.invalidate_model()
+
+        # Open sessions update their badge from the bus instead of polling
+        for user in self.env['res.users'].sudo().browse(user_ids):
+            user.partner_id._bus_send('custom_approval.pending_count', {'count': counts.get(user.id, 0)})
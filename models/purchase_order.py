@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-from odoo import models, fields, api, _
+from odoo import models, fields, api, tools, _
 from odoo.exceptions import UserError
 
 class PurchaseOrder(models.Model):
@@ -15,6 +15,8 @@ class PurchaseOrder(models.Model):
         ('approved', 'Approved'),
         ('refused', 'Refused'),
     ], string='Approval Status', compute='_compute_approval_status', store=False)
+    approval_gated = fields.Boolean(string='Waiting for Approval', copy=False,
+                                    help='Confirmation was held by an approval rule; the order is confirmed once approved')
 
     @api.depends('approval_request_ids.state')
     def _compute_approval_request_count(self):
@@ -35,20 +37,31 @@ class PurchaseOrder(models.Model):
             else:
                 order.approval_status = 'no'
 
+    @api.model
+    @tools.ormcache('company_id')
+    def _get_approval_category_id(self, company_id):
+        """Return the default approval category for purchase orders of a company"""
+        Category = self.env['approval.category'].sudo()
+        category = self.env.ref('custom_approval.approval_category_purchase', raise_if_not_found=False)
+        if category and category.sudo().active and category.sudo().company_id.id in (False, company_id):
+            return category.id
+        company_domain = [('company_id', 'in', (False, company_id))]
+        category = Category.search([('name', 'ilike', 'Purchase')] + company_domain, limit=1)
+        if not category:
+            category = Category.search(company_domain, limit=1)
+        return category.id
+
     def action_create_approval_request(self):
         """Create an approval request for this purchase order"""
         self.ensure_one()
-        # Find a suitable category (e.g. Purchase Request)
-        category = self.env['approval.category'].search([('name', 'ilike', 'Purchase')], limit=1)
-        if not category:
-            category = self.env['approval.category'].search([], limit=1)
-        
+        category_id = self._get_approval_category_id(self.company_id.id)
+
         return {
             'type': 'ir.actions.act_window',
             'res_model': 'approval.request',
             'view_mode': 'form',
             'context': {
-                'default_category_id': category.id if category else False,
+                'default_category_id': category_id,
                 'default_name': _('Approval for %s', self.name),
                 'default_res_model': self._name,
                 'default_res_id': self.id,
@@ -59,11 +72,77 @@ class PurchaseOrder(models.Model):
         }
 
     def button_confirm(self):
-        """Override to check approval status before confirmation"""
-        for order in self:
+        """Override to check approval status before confirmation.
+
+        Orders matching a purchase approval rule get an approval request created
+        and submitted in bulk instead of being confirmed; they are confirmed
+        when their request is approved.
+        """
+        if self.env.context.get('approval_release'):
+            return super(PurchaseOrder, self).button_confirm()
+
+        # Held orders stay in the RFQ list: skip them so that bulk confirmations go through
+        waiting = self.filtered(lambda o: o.approval_gated and o.approval_status == 'to_approve')
+        if waiting and waiting == self:
+            raise UserError(_('These orders are waiting for their approval request and will be confirmed once it is approved: %s')
+                            % ', '.join(waiting.mapped('name')))
+        orders = self - waiting
+        for order in orders:
             if order.approval_request_ids and order.approval_status != 'approved':
                 raise UserError(_('You cannot confirm this order because the approval request is not approved.'))
-        return super(PurchaseOrder, self).button_confirm()
+
+        candidates = orders.filtered(lambda o: o.state in ('draft', 'sent') and not o.approval_request_ids)
+        matches = self.env['approval.purchase.rule']._match_orders(candidates)
+        gated = self.browse([order.id for order in matches])
+        gated._submit_approval_requests(matches)
+
+        res = True
+        to_confirm = orders - gated
+        if to_confirm:
+            res = super(PurchaseOrder, to_confirm).button_confirm()
+        if waiting and res is True:
+            return {
+                'type': 'ir.actions.client',
+                'tag': 'display_notification',
+                'params': {
+                    'type': 'warning',
+                    'message': _('Skipped orders waiting for approval: %s') % ', '.join(waiting.mapped('name')),
+                    'next': {'type': 'ir.actions.client', 'tag': 'soft_reload'},
+                },
+            }
+        return res
+
+    def _submit_approval_requests(self, categories):
+        """Create and submit one approval request per order, in bulk"""
+        if not self:
+            return
+        requests = self.env['approval.request'].sudo().create([{
+            'category_id': categories[order],
+            'request_owner_id': order.user_id.id or self.env.uid,
+            'amount': order.amount_total,
+            'currency_id': order.currency_id.id,
+            'partner_id': order.partner_id.id,
+            'reference': order.name,
+            'res_model': self._name,
+            'res_id': order.id,
+            'company_id': order.company_id.id,
+        } for order in self])
+        requests.action_confirm()
+        self.write({'approval_gated': True})
+        self._message_log_batch(bodies={
+            request.res_id: _('Approval request %s submitted; the order will be confirmed once it is approved.') % request.name
+            for request in requests
+        })
+
+    @api.model
+    def _release_approved_orders(self, requests):
+        """Confirm, in bulk, the orders held by the given approved requests"""
+        orders = self.sudo().browse(set(requests.mapped('res_id'))).exists().filtered(
+            lambda o: o.approval_gated and o.state in ('draft', 'sent') and o.approval_status == 'approved'
+        )
+        if orders:
+            orders.write({'approval_gated': False})
+            orders.with_context(approval_release=True).button_confirm()
 
     def action_view_approval_requests(self):
         """View approval requests for this purchase order"""
@@ -1,5 +1,80 @@
 /** @odoo-module **/
 
 // Approval Kanban enhancements
-// This file can be extended for custom kanban behaviors
+// Per-state and per-category totals come from one grouped query, and the
+// next page of cards is loaded when a column is scrolled to its end.
 
+import { onWillStart, useEffect, useRef, useState } from "@odoo/owl";
+import { registry } from "@web/core/registry";
+import { useService } from "@web/core/utils/hooks";
+import { kanbanView } from "@web/views/kanban/kanban_view";
+import { KanbanRenderer } from "@web/views/kanban/kanban_renderer";
+
+export class ApprovalKanbanRenderer extends KanbanRenderer {
+    static template = "custom_approval.ApprovalKanbanRenderer";
+
+    setup() {
+        super.setup();
+        this.orm = useService("orm");
+        this.counters = useState({ states: [], categories: [] });
+        this.countersKey = null;
+
+        onWillStart(() => this.loadCounters(this.props.list));
+        // Counters follow the domain and the group counts, which change on drag and drop
+        useEffect(
+            () => {
+                this.loadCounters(this.props.list);
+            },
+            () => [this.getCountersKey(this.props.list)]
+        );
+
+        const rootRef = useRef("root");
+        useEffect(
+            () => {
+                const root = rootRef.el;
+                if (!root) {
+                    return;
+                }
+                // Buttons whose load is in progress; the effect runs again, with a
+                // new set, once the loaded records are rendered
+                const pendingLoads = new WeakSet();
+                const observer = new IntersectionObserver((entries) => {
+                    for (const entry of entries) {
+                        if (entry.isIntersecting && !pendingLoads.has(entry.target)) {
+                            pendingLoads.add(entry.target);
+                            entry.target.click();
+                        }
+                    }
+                });
+                for (const button of root.querySelectorAll(".o_kanban_load_more button")) {
+                    observer.observe(button);
+                }
+                return () => observer.disconnect();
+            },
+            () => [
+                this.props.list.records.length,
+                this.props.list.groups?.map((group) => group.list.records.length).join(),
+            ]
+        );
+    }
+
+    getCountersKey(list) {
+        const counts = list.groups ? list.groups.map((group) => [group.value, group.count]) : list.count;
+        return JSON.stringify([list.domain, counts]);
+    }
+
+    async loadCounters(list) {
+        const key = this.getCountersKey(list);
+        if (key === this.countersKey) {
+            return;
+        }
+        this.countersKey = key;
+        const counters = await this.orm.call("approval.request", "get_kanban_counters", [list.domain]);
+        Object.assign(this.counters, counters);
+    }
+}
+
+registry.category("views").add("approval_request_kanban", {
+    ...kanbanView,
+    Renderer: ApprovalKanbanRenderer,
+});
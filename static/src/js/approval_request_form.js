@@ -1,5 +1,113 @@
 /** @odoo-module **/
 
 // Approval Request Form enhancements
-// This file can be extended for custom form behaviors
+// Changing the category or the owner is resolved in the browser from a routing
+// summary cached per category and owner, instead of an onchange round trip.
+// Approver lines are created by the server when the request is saved.
 
+import { Component, useState } from "@odoo/owl";
+import { registry } from "@web/core/registry";
+import { useService } from "@web/core/utils/hooks";
+import { formView } from "@web/views/form/form_view";
+import { RelationalModel } from "@web/model/relational_model/relational_model";
+import { Record } from "@web/model/relational_model/record";
+import { useRecordObserver } from "@web/model/relational_model/utils";
+import { standardWidgetProps } from "@web/views/widgets/standard_widget_props";
+
+const ROUTING_TRIGGERS = ["category_id", "request_owner_id"];
+
+function many2oneId(value) {
+    if (Array.isArray(value)) {
+        return value[0];
+    }
+    if (value && typeof value === "object") {
+        return value.id;
+    }
+    return value || false;
+}
+
+export const approvalRoutingService = {
+    dependencies: ["orm"],
+    start(env, { orm }) {
+        const cache = new Map();
+        return {
+            getSummary(categoryId, ownerId) {
+                const key = `${categoryId}-${ownerId || 0}`;
+                if (!cache.has(key)) {
+                    const summary = orm.call("approval.request", "get_routing_summary", [
+                        categoryId,
+                        ownerId || false,
+                    ]);
+                    summary.catch(() => cache.delete(key));
+                    cache.set(key, summary);
+                }
+                return cache.get(key);
+            },
+        };
+    },
+};
+
+export class ApprovalRequestRecord extends Record {
+    async _update(changes, options = {}) {
+        const routing = this.model.approvalRouting;
+        if (
+            routing &&
+            this.resModel === "approval.request" &&
+            ROUTING_TRIGGERS.some((name) => name in changes)
+        ) {
+            const categoryId = many2oneId(
+                "category_id" in changes ? changes.category_id : this.data.category_id
+            );
+            const ownerId = many2oneId(
+                "request_owner_id" in changes ? changes.request_owner_id : this.data.request_owner_id
+            );
+            if (categoryId) {
+                const summary = await routing.getSummary(categoryId, ownerId);
+                const fields = {};
+                for (const [name, value] of Object.entries(summary.fields || {})) {
+                    if (name in this.activeFields) {
+                        fields[name] = value;
+                    }
+                }
+                return super._update({ ...changes, ...fields }, { ...options, withoutOnchange: true });
+            }
+        }
+        return super._update(changes, options);
+    }
+}
+
+export class ApprovalRequestModel extends RelationalModel {
+    static Record = ApprovalRequestRecord;
+    static services = [...RelationalModel.services, "approval_routing"];
+
+    setup(params, services) {
+        super.setup(...arguments);
+        this.approvalRouting = services.approval_routing;
+    }
+}
+
+export class ApprovalRoutingPreview extends Component {
+    static template = "custom_approval.ApprovalRoutingPreview";
+    static props = { ...standardWidgetProps };
+
+    setup() {
+        this.approvalRouting = useService("approval_routing");
+        this.state = useState({ summary: null });
+        useRecordObserver(async (record) => {
+            const categoryId = many2oneId(record.data.category_id);
+            const ownerId = many2oneId(record.data.request_owner_id);
+            this.state.summary = categoryId
+                ? await this.approvalRouting.getSummary(categoryId, ownerId)
+                : null;
+        });
+    }
+}
+
+registry.category("services").add("approval_routing", approvalRoutingService);
+registry.category("views").add("approval_request_form", {
+    ...formView,
+    Model: ApprovalRequestModel,
+});
+registry.category("view_widgets").add("approval_routing_preview", {
+    component: ApprovalRoutingPreview,
+});
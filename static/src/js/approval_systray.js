@@ -0,0 +1,41 @@
+/** @odoo-module **/
+
+// Approvals systray counter
+// The count is read from the per-user cache once, then kept up to date by
+// bus notifications sent when the user's approver lines change.
+
+import { Component, onWillStart, useState } from "@odoo/owl";
+import { registry } from "@web/core/registry";
+import { user } from "@web/core/user";
+import { useService } from "@web/core/utils/hooks";
+
+export class ApprovalSystray extends Component {
+    static template = "custom_approval.ApprovalSystray";
+    static props = {};
+
+    setup() {
+        this.orm = useService("orm");
+        this.action = useService("action");
+        this.state = useState({ count: 0, visible: false });
+
+        onWillStart(async () => {
+            this.state.visible = await user.hasGroup("custom_approval.group_approval_user");
+            if (this.state.visible) {
+                this.state.count = await this.orm.call(
+                    "approval.user.counter",
+                    "get_my_pending_count",
+                    []
+                );
+            }
+        });
+        this.env.services.bus_service.subscribe("custom_approval.pending_count", ({ count }) => {
+            this.state.count = count;
+        });
+    }
+
+    openRequestsToApprove() {
+        this.action.doAction("custom_approval.action_approval_request_to_approve");
+    }
+}
+
+registry.category("systray").add("custom_approval.pending_count", { Component: ApprovalSystray }, { sequence: 30 });
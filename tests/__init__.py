@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+
+from . import test_approval_import
+from . import test_approval_quorum
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+import base64
+import json
+from unittest.mock import patch
+
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestApprovalImport(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.category = cls.env['approval.category'].create({
+            'name': 'Import Test',
+            'approval_type': 'user',
+            'approver_ids': [(0, 0, {'user_id': cls.env.user.id})],
+        })
+        valid = {'name': 'IMP/%s', 'category': 'Import Test', 'owner': cls.env.user.login, 'state': 'approved',
+                 'approvers': [{'login': cls.env.user.login, 'status': 'approved'}]}
+        lines = [
+            json.dumps(dict(valid, name='IMP/1')),
+            json.dumps(dict(valid, name='IMP/2', owner=['not', 'a', 'login'])),
+            '{"name": "IMP/3", not json',
+            json.dumps(dict(valid, name='IMP/4', approvers=[{'login': {'nested': True}}])),
+            json.dumps(dict(valid, name='IMP/5')),
+        ]
+        cls.job = cls.env['approval.import.job'].create({
+            'name': 'Malformed rows',
+            'file': base64.b64encode('\n'.join(lines).encode()),
+            'filename': 'history.jsonl',
+            'file_type': 'jsonl',
+            'batch_size': 2,
+            'state': 'running',
+        })
+
+    def _run(self):
+        # The import commits after each chunk; the test transaction must not
+        with patch.object(self.env.cr, 'commit', lambda: None):
+            self.job._run()
+
+    def _imported_names(self):
+        return self.env['approval.request'].search([('name', 'like', 'IMP/')]).mapped('name')
+
+    def test_malformed_rows_rejected(self):
+        """Malformed rows are rejected one by one, the rest of their chunk is imported"""
+        self._run()
+        self.assertEqual(self.job.state, 'done')
+        self.assertEqual(self.job.rows_done, 5)
+        self.assertEqual(self.job.imported_count, 2)
+        self.assertEqual(self.job.error_count, 3)
+        self.assertEqual(sorted(self._imported_names()), ['IMP/1', 'IMP/5'])
+
+    def test_resume_after_malformed_chunk(self):
+        """A resumed import starts at its checkpoint and gets past malformed rows"""
+        self.job.write({'rows_done': 2, 'state': 'running'})
+        self._run()
+        self.assertEqual(self.job.state, 'done')
+        self.assertEqual(self.job.rows_done, 5)
+        self.assertEqual(self.job.imported_count, 1)
+        self.assertEqual(self.job.error_count, 2)
+        self.assertEqual(self._imported_names(), ['IMP/5'])
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestApprovalQuorum(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        group = cls.env.ref('custom_approval.group_approval_user')
+        cls.user_a, cls.user_b, cls.user_c = cls.env['res.users'].create([{
+            'name': 'Approver %s' % letter,
+            'login': 'approver_%s' % letter,
+            'email': 'approver_%s@example.com' % letter,
+            'groups_id': [(6, 0, group.ids)],
+        } for letter in 'abc'])
+
+    def _create_category(self, users, grouped_users, approval_minimum=1, quorum=1, sequential=False):
+        category = self.env['approval.category'].create({
+            'name': 'Quorum Test',
+            'approval_type': 'user',
+            'approval_minimum': approval_minimum,
+            'approval_sequence': sequential,
+            'approver_ids': [(0, 0, {'user_id': user.id, 'sequence': 10 * index})
+                             for index, user in enumerate(users, start=1)],
+        })
+        approver_group = self.env['approval.approver.group'].create({
+            'name': 'Finance',
+            'category_id': category.id,
+            'quorum': quorum,
+        })
+        category.approver_ids.filtered(lambda a: a.user_id in grouped_users).group_id = approver_group
+        return category
+
+    def _submit(self, category):
+        request = self.env['approval.request'].create({'name': 'Test', 'category_id': category.id})
+        request.action_confirm()
+        return request
+
+    def _decide(self, request, user, decision):
+        approver = request.approver_ids.filtered(lambda a: a.user_id == user).with_user(user)
+        if decision == 'approve':
+            approver.action_approve()
+        else:
+            approver.action_refuse(comment='No')
+
+    def test_refusal_absorbed_by_group(self):
+        """A refusal within a group that can still reach its quorum keeps the request pending"""
+        category = self._create_category(self.user_a | self.user_b, self.user_a | self.user_b)
+        request = self._submit(category)
+        self._decide(request, self.user_a, 'refuse')
+        self.assertEqual(request.state, 'pending')
+        self._decide(request, self.user_b, 'approve')
+        self.assertEqual(request.state, 'approved')
+
+    def test_escalation_refusal_absorbed_by_group(self):
+        """An overdue line refused by escalation goes through the same group decision"""
+        category = self._create_category(self.user_a | self.user_b, self.user_a | self.user_b)
+        category.escalation_policy = 'refuse'
+        request = self._submit(category)
+        overdue = request.approver_ids.filtered(lambda a: a.user_id == self.user_a)
+        overdue._escalate()
+        self.assertEqual(overdue.status, 'refused')
+        self.assertEqual(request.state, 'pending')
+        request.approver_ids.filtered(lambda a: a.user_id == self.user_b)._escalate()
+        self.assertEqual(request.state, 'refused')
+
+    def test_refusal_below_minimum(self):
+        """A refusal leaving fewer approvers than the minimum refuses the request"""
+        category = self._create_category(self.user_a | self.user_b, self.user_a | self.user_b, approval_minimum=2)
+        request = self._submit(category)
+        self._decide(request, self.user_a, 'refuse')
+        self.assertEqual(request.state, 'refused')
+
+    def test_refusal_sequential(self):
+        """In sequential categories, a refused group line would block the next steps: it refuses the request"""
+        category = self._create_category(
+            self.user_a | self.user_b | self.user_c, self.user_a | self.user_b, sequential=True,
+        )
+        request = self._submit(category)
+        self._decide(request, self.user_a, 'refuse')
+        self.assertEqual(request.state, 'refused')